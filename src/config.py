@@ -48,6 +48,7 @@ POINT_IMAGE_PATH = get_asset_path("images/poin.png")
 
 FLOOR_BLOCK_CSV_PATH = get_asset_path("maps_data/map_floorblock.csv")
 ENTITY_CSV_PATH = get_asset_path("maps_data/map_Entity.csv")
+MAP_BUNDLE_PATH = get_asset_path("maps_data/map.bundle") # Bản đồ biên dịch sẵn từ hai file CSV trên, tự biên dịch lại khi CSV đổi
 MAZE_Q_TABLE_CSV_PATH = get_asset_path("q_tables/maze_q_table.csv") # Tệp hướng dẫn q_learning
 THEME_FILE_PATH = get_asset_path("ui_themes/theme.json")
 
@@ -199,10 +200,29 @@ CONFIRM_BUTTON_HEIGHT = 40
 CONFIRM_BUTTON_TEXT = "Xác nhận"
 
 # Hằng số cho thuật toán tìm đường
-BEAM_SEARCH_WIDTH_DEFAULT = 3
+BEAM_SEARCH_WIDTH_DEFAULT = 16
 DEFAULT_PATHFINDING_ALGORITHM_NAME = "A* (A-star)"
 BACKTRACKING_MAX_DEPTH_FACTOR = 1.5
 BACKTRACKING_MAX_CALLS_FACTOR = 5
+BACKTRACKING_BRANCH_AND_BOUND = True # Cắt nhánh theo cận dưới để quay lui tìm được đường ngắn nhất trên bản đồ lớn
+TAXI_QUOTE_SCHEDULER = "frame" # "frame": chia nhỏ tìm kiếm qua các khung hình; "threads": chạy trên pool luồng
+TAXI_QUOTE_WORKERS = 4 # Số luồng tính giá taxi song song (khi TAXI_QUOTE_SCHEDULER = "threads", và cho các gói cước không chia nhỏ được)
+PATHFINDING_SLICE_NODES = 64 # Số nút tối đa mở rộng giữa hai lần tạm dừng của một lượt tìm kiếm
+PATHFINDING_FRAME_BUDGET_MS = 8 # Thời gian tối đa mỗi khung hình dành cho tìm đường
+HPA_CLUSTER_SIZE = 16 # Kích thước cụm (ô) của lớp tìm đường phân cấp HPA*
+HPA_SEGMENT_CACHE_MAX_ENTRIES = 1024 # Số đoạn đường đã làm mịn của HPA* được giữ lại (LRU)
+PATH_CACHE_MAX_ENTRIES = 128 # Số kết quả tìm đường gần nhất được giữ lại
+DISTANCE_FIELD_PERSIST = False # Lưu bản đồ khoảng cách tới các điểm giao hàng ra file
+DISTANCE_FIELD_CACHE_PATH = get_asset_path("maps_data/distance_fields.bin")
+ALT_LANDMARK_COUNT = 8 # Số ô mốc của heuristic ALT, chọn và tính khoảng cách một lần khi nạp bản đồ
+ALT_HEURISTIC_ENABLED = True # Dùng heuristic ALT cho A*, Greedy BFS và BEAM_SEARCH thay cho khoảng cách Euclid
+INCREMENTAL_PLANNER_ENABLED = True # Thêm gói cước D* Lite: giữ cây tìm kiếm tới điểm giao hàng và chỉ sửa phần thay đổi
+TAXI_SPECULATIVE_QUOTES = True # Tính trước giá taxi khi có điểm giao hàng mới và khi người chơi đổi ô
+TAXI_SPECULATIVE_BUDGET_MS = 3 # Thời gian tối đa mỗi khung hình dành cho việc tính trước giá taxi
+TAXI_SPECULATIVE_SETTLE_FRAMES = 15 # Số khung hình người chơi phải đứng yên trên ô mới trước khi tính trước lại giá
+TAXI_SPECULATIVE_MOVE_MAX_MS = 4 # Khi người chơi đổi ô, chỉ tính trước lại các gói cước có lần chạy gần nhất không quá số ms này
+PATHFINDING_METRICS_SIZE = 1000 # Số lượt tìm đường gần nhất được giữ trong sổ đo (F2 để xem bảng thống kê)
+PATHFINDING_METRICS_DUMP_PATH = None # File .csv hoặc .json để ghi sổ đo khi thoát game; None để tắt
 
 # Hằng số cho các thông báo
 STATUS_PANEL_X = 10
@@ -0,0 +1,76 @@
+DIRECTION_DELTAS = {
+    'W': (-1, 0),
+    'S': (1, 0),
+    'A': (0, -1),
+    'D': (0, 1),
+}
+
+
+class ActionPlan:
+    """
+    Lộ trình di chuyển nén theo đoạn thẳng.
+
+    `segments` là danh sách `(hướng, số_ô)` với hướng là một trong 'W'/'A'/'S'/'D';
+    `waypoints` chỉ giữ các ô ở đầu đường và cuối mỗi đoạn (r, c), nên
+    `waypoints[i + 1]` là ô mà người chơi phải đứng sau khi đi hết `segments[i]`.
+    """
+
+    __slots__ = ('segments', 'waypoints', 'tile_count')
+
+    def __init__(self, segments=None, waypoints=None):
+        self.segments = segments if segments is not None else []
+        self.waypoints = waypoints if waypoints is not None else []
+        self.tile_count = sum(count for _, count in self.segments)
+
+    @classmethod
+    def from_path(cls, path_nodes):
+        """Gộp các bước liên tiếp cùng hướng của một đường (r, c) thành các đoạn."""
+        if not path_nodes or len(path_nodes) < 2:
+            return cls()
+        segments, waypoints = [], [tuple(path_nodes[0])]
+        direction, count = None, 0
+        prev_r, prev_c = path_nodes[0]
+        for r, c in path_nodes[1:]:
+            dr, dc = r - prev_r, c - prev_c
+            if dr == -1: step = 'W'
+            elif dr == 1: step = 'S'
+            elif dc == -1: step = 'A'
+            elif dc == 1: step = 'D'
+            else:
+                raise ValueError(f"Hai ô liên tiếp không kề nhau: {(prev_r, prev_c)} -> {(r, c)}")
+            if step != direction and direction is not None:
+                segments.append((direction, count))
+                waypoints.append((prev_r, prev_c))
+                count = 0
+            direction = step
+            count += 1
+            prev_r, prev_c = r, c
+        segments.append((direction, count))
+        waypoints.append((prev_r, prev_c))
+        return cls(segments, waypoints)
+
+    @classmethod
+    def from_actions(cls, actions, path_nodes=None):
+        """Chuyển danh sách hành động cũ (mỗi ô một ký tự) sang lộ trình đoạn thẳng."""
+        if path_nodes:
+            return cls.from_path(path_nodes)
+        segments = []
+        for action in actions:
+            if segments and segments[-1][0] == action:
+                segments[-1] = (action, segments[-1][1] + 1)
+            else:
+                segments.append((action, 1))
+        return cls(segments)
+
+    def to_actions(self):
+        """Bung lại thành danh sách 'W'/'A'/'S'/'D' mỗi ô một phần tử."""
+        actions = []
+        for direction, count in self.segments:
+            actions.extend(direction * count)
+        return actions
+
+    def __len__(self):
+        return self.tile_count
+
+    def __bool__(self):
+        return bool(self.segments)
@@ -2,6 +2,7 @@
 import pygame
 import os
 import src.config as config
+from src.core.action_plan import ActionPlan, DIRECTION_DELTAS
 
 class Player(pygame.sprite.Sprite):
     def __init__(self, x, y, speed=config.PLAYER_DEFAULT_SPEED):
@@ -45,14 +46,19 @@ class Player(pygame.sprite.Sprite):
 
 
     def set_actions(self, actions, path_nodes=None):
-       
-        self.actions = actions
-        self.target_path_nodes = path_nodes if path_nodes else []
+        """
+        Nhận một ActionPlan (hoặc danh sách 'W'/'A'/'S'/'D' kiểu cũ kèm đường đi).
+        `actions` giữ các đoạn `(hướng, số_ô)`, `target_path_nodes` giữ các ô cuối đoạn.
+        """
+        if not isinstance(actions, ActionPlan):
+            actions = ActionPlan.from_actions(actions or [], path_nodes)
+        self.actions = actions.segments
+        self.target_path_nodes = actions.waypoints
         self.action_index = 0
         self.move_progress = 0
         self.current_dx_normalized = 0
         self.current_dy_normalized = 0
-        if not actions:
+        if not self.actions:
             self.target_path_nodes = []
 
     def add_money(self, amount):
@@ -84,7 +90,7 @@ class Player(pygame.sprite.Sprite):
         print(f"Người chơi đã thu thập món hàng thứ {self.items_collected_count}. Tổng tiền: {self.money}")
 
 
-    def move(self, dx_pixel, dy_pixel, collidable_tiles):
+    def move(self, dx_pixel, dy_pixel, world_map):
        
         new_x = self.x + dx_pixel
         new_y = self.y + dy_pixel
@@ -92,30 +98,28 @@ class Player(pygame.sprite.Sprite):
         temp_rect_x = self.rect.copy()
         temp_rect_x.x = round(new_x)
         collision_x = False
-        for tile in collidable_tiles:
-            if tile.is_collidable and temp_rect_x.colliderect(tile.rect):
-                collision_x = True
-                if dx_pixel > 0: new_x = tile.rect.left - self.rect.width
-                elif dx_pixel < 0: new_x = tile.rect.right
-                if self.actions: self.set_actions([], None)
-                break
+        tile_rect = world_map.first_blocked_rect(temp_rect_x)
+        if tile_rect is not None:
+            collision_x = True
+            if dx_pixel > 0: new_x = tile_rect.left - self.rect.width
+            elif dx_pixel < 0: new_x = tile_rect.right
+            if self.actions: self.set_actions([], None)
         self.x = new_x
         self.rect.x = round(self.x)
         temp_rect_y = self.rect.copy()
         temp_rect_y.y = round(new_y)
         collision_y = False
-        for tile in collidable_tiles:
-            if tile.is_collidable and temp_rect_y.colliderect(tile.rect):
-                collision_y = True
-                if dy_pixel > 0: new_y = tile.rect.top - self.rect.height
-                elif dy_pixel < 0: new_y = tile.rect.bottom
-                if self.actions: self.set_actions([], None)
-                break
+        tile_rect = world_map.first_blocked_rect(temp_rect_y)
+        if tile_rect is not None:
+            collision_y = True
+            if dy_pixel > 0: new_y = tile_rect.top - self.rect.height
+            elif dy_pixel < 0: new_y = tile_rect.bottom
+            if self.actions: self.set_actions([], None)
         self.y = new_y
         self.rect.y = round(self.y)
         return collision_x or collision_y
 
-    def update(self, collidable_tiles, delta_time):
+    def update(self, world_map, delta_time):
        
         self.animation_timer += delta_time
         final_anim_dx = 0
@@ -123,19 +127,17 @@ class Player(pygame.sprite.Sprite):
         is_currently_moving = False
 
         if self.actions and self.action_index < len(self.actions):
+            direction, tile_count = self.actions[self.action_index]
             if self.move_progress == 0: 
-                action = self.actions[self.action_index]
-                if action == 'W': self.current_dx_normalized, self.current_dy_normalized = 0, -1
-                elif action == 'S': self.current_dx_normalized, self.current_dy_normalized = 0, 1
-                elif action == 'A': self.current_dx_normalized, self.current_dy_normalized = -1, 0
-                elif action == 'D': self.current_dx_normalized, self.current_dy_normalized = 1, 0
+                dr, dc = DIRECTION_DELTAS[direction]
+                self.current_dx_normalized, self.current_dy_normalized = dc, dr
             
             final_anim_dx = self.current_dx_normalized
             final_anim_dy = self.current_dy_normalized
             is_currently_moving = (final_anim_dx != 0 or final_anim_dy != 0)
             move_x_pixel = self.current_dx_normalized * self.speed
             move_y_pixel = self.current_dy_normalized * self.speed
-            self.move(move_x_pixel, move_y_pixel, collidable_tiles)
+            self.move(move_x_pixel, move_y_pixel, world_map)
 
             if not self.actions: 
                 self.move_progress = 0
@@ -147,7 +149,7 @@ class Player(pygame.sprite.Sprite):
                 final_anim_dy = 0
             else:
                 self.move_progress += self.speed
-                if self.move_progress >= config.TILE_SIZE:
+                if self.move_progress >= tile_count * config.TILE_SIZE:
                     if self.target_path_nodes and self.action_index < len(self.target_path_nodes) -1:
                         target_node_coords = self.target_path_nodes[self.action_index + 1]
                         self.x = float(target_node_coords[1] * config.TILE_SIZE)
@@ -176,7 +178,7 @@ class Player(pygame.sprite.Sprite):
             if is_currently_moving:
                 move_x_pixel = manual_dx_normalized * self.speed
                 move_y_pixel = manual_dy_normalized * self.speed
-                self.move(move_x_pixel, move_y_pixel, collidable_tiles)
+                self.move(move_x_pixel, move_y_pixel, world_map)
         
         if is_currently_moving:
             if final_anim_dx < 0: 
@@ -4,10 +4,10 @@ import random
 import src.config as config 
 
 class PointManager:
-    def __init__(self, entity_data): 
+    def __init__(self, world_map): 
         self.tile_size = config.TILE_SIZE
         self.spawn_points_pixels = []
-        self._find_spawn_points(entity_data) 
+        self._find_spawn_points(world_map) 
 
         self.image = None
         try:
@@ -22,16 +22,17 @@ class PointManager:
         self.current_point_center = None 
         self.is_visible = False
         self.collected_point_for_puzzle_center = None 
+        self.spawn_listeners = []
 
         if not self.spawn_points_pixels:
             print(f"Cảnh báo: Không tìm thấy vị trí nào có ID '{config.POINT_ENTITY_ID}' cho điểm thu thập.")
         else:
              self.spawn_new_point()
 
-    def reset(self, entity_data):
+    def reset(self, world_map):
         print("Resetting PointManager...")
         self.spawn_points_pixels = []
-        self._find_spawn_points(entity_data) 
+        self._find_spawn_points(world_map) 
         self.is_visible = False
         self.current_point_rect = None
         self.current_point_center = None
@@ -41,15 +42,24 @@ class PointManager:
         else:
              self.spawn_new_point() 
 
-    def _find_spawn_points(self, entity_data):
-        """Tìm tất cả các vị trí có thể spawn điểm dựa trên entity_data."""
-        for r, row in enumerate(entity_data):
-            for c, entity_value in enumerate(row):
-                if entity_value.strip() == config.POINT_ENTITY_ID: 
-                    
-                    center_x = c * self.tile_size + self.tile_size // 2
-                    center_y = r * self.tile_size + self.tile_size // 2
-                    self.spawn_points_pixels.append((center_x, center_y))
+    def add_spawn_listener(self, listener):
+        """Đăng ký `listener(point_center)`, được gọi mỗi khi điểm giao hàng hiện tại thay đổi (None nếu không còn điểm)."""
+        if listener not in self.spawn_listeners:
+            self.spawn_listeners.append(listener)
+
+    def remove_spawn_listener(self, listener):
+        if listener in self.spawn_listeners:
+            self.spawn_listeners.remove(listener)
+
+    def _notify_spawn(self):
+        center = self.current_point_center if self.is_visible else None
+        for listener in list(self.spawn_listeners):
+            listener(center)
+
+    def _find_spawn_points(self, world_map):
+        """Tìm tất cả các vị trí có thể spawn điểm từ chỉ mục thực thể của WorldMap."""
+        for r, c in world_map.entity_positions(config.POINT_ENTITY_ID):
+            self.spawn_points_pixels.append(world_map.tile_center(r, c))
 
     def spawn_new_point(self, exclude_center=None):
         """Spawn một điểm mới tại một vị trí ngẫu nhiên, có thể loại trừ một vị trí."""
@@ -57,6 +67,7 @@ class PointManager:
             self.is_visible = False
             self.current_point_rect = None
             self.current_point_center = None
+            self._notify_spawn()
             return
 
         possible_spawns = self.spawn_points_pixels
@@ -79,6 +90,7 @@ class PointManager:
             self.current_point_rect = None 
         
         self.collected_point_for_puzzle_center = None 
+        self._notify_spawn()
 
     def can_attempt_collect(self, player_center, f_key_pressed):
         """
@@ -0,0 +1,116 @@
+import pygame
+import src.config as config
+from src.pathfinding.grid_map import GridMap
+from src.utils.map_bundle import load_map_bundle, merge_blocked_rects
+
+
+class WorldMap:
+    """
+    Mô hình bản đồ dùng chung cho Game, PathFinder, PointManager và Player.
+
+    Ô đi được/vật cản chỉ được lưu một lần trong `grid` (GridMap, bytearray có viền);
+    PathFinder tìm đường trực tiếp trên lưới này, còn va chạm và lớp vẽ debug đọc các ô
+    vật cản từ cùng lưới đó, nên mọi thay đổi qua `grid.set_blocked` được thấy ở khắp nơi.
+    """
+
+    def __init__(self, grid, entities, tile_size=config.TILE_SIZE):
+        self.grid = grid
+        self.tile_size = tile_size
+        # Mã thực thể (int) -> danh sách ô (r, c) theo thứ tự quét hàng của CSV.
+        self.entities = entities
+
+    @classmethod
+    def from_bundle(cls, map_bundle, tile_size=config.TILE_SIZE):
+        grid = GridMap.from_passability(map_bundle.rows, map_bundle.cols, map_bundle.passability)
+        entities = {entity_id: list(cells) for entity_id, cells in map_bundle.entities.items()}
+        world_map = cls(grid, entities, tile_size)
+        # Bundle đã gộp sẵn các ô vật cản lúc biên dịch: dùng luôn cho phiên bản lưới hiện tại.
+        rects = [world_map._pixel_rect(*rect) for rect in map_bundle.collision_rects]
+        grid.derived('collision_rects', lambda _grid: rects)
+        return world_map
+
+    @classmethod
+    def load(cls, floor_csv_path=config.FLOOR_BLOCK_CSV_PATH, entity_csv_path=config.ENTITY_CSV_PATH,
+             bundle_path=config.MAP_BUNDLE_PATH):
+        """Nạp bản đồ từ bundle biên dịch sẵn (tự biên dịch lại khi CSV đổi)."""
+        return cls.from_bundle(load_map_bundle(floor_csv_path, entity_csv_path, bundle_path))
+
+    @property
+    def rows(self):
+        return self.grid.rows
+
+    @property
+    def cols(self):
+        return self.grid.cols
+
+    @property
+    def pixel_width(self):
+        return self.grid.cols * self.tile_size
+
+    @property
+    def pixel_height(self):
+        return self.grid.rows * self.tile_size
+
+    def is_walkable(self, row, col):
+        return self.grid.is_walkable(row, col)
+
+    def is_blocked(self, row, col):
+        return not self.grid.is_walkable(row, col)
+
+    def pixel_to_tile(self, x, y):
+        return int(y // self.tile_size), int(x // self.tile_size)
+
+    def tile_rect(self, row, col):
+        return pygame.Rect(col * self.tile_size, row * self.tile_size, self.tile_size, self.tile_size)
+
+    def tile_center(self, row, col):
+        return col * self.tile_size + self.tile_size // 2, row * self.tile_size + self.tile_size // 2
+
+    def entity_positions(self, entity_id):
+        """Các ô (r, c) có thực thể `entity_id` (chuỗi như trong config hoặc số)."""
+        try:
+            return list(self.entities.get(int(entity_id), ()))
+        except ValueError:
+            return []
+
+    def first_blocked_rect(self, rect):
+        """
+        Ô vật cản đầu tiên (theo thứ tự quét hàng) mà `rect` chồng lên,
+        dưới dạng pygame.Rect; None nếu không có. Chỉ xét các ô mà `rect` thực sự phủ (1-4 ô với
+        người chơi nhỏ hơn một ô), nên chi phí không phụ thuộc kích thước bản đồ.
+        """
+        size, grid = self.tile_size, self.grid
+        cells, stride = grid.cells, grid.stride
+        first_row, last_row = max(rect.top // size, 0), min((rect.bottom - 1) // size, grid.rows - 1)
+        first_col, last_col = max(rect.left // size, 0), min((rect.right - 1) // size, grid.cols - 1)
+        for r in range(first_row, last_row + 1):
+            row_start = (r + 1) * stride + 1
+            for c in range(first_col, last_col + 1):
+                if cells[row_start + c]:
+                    return self.tile_rect(r, c)
+        return None
+
+    def collision_rects(self):
+        """
+        Các ô vật cản đã gộp thành hình chữ nhật lớn (pixel), xem `merge_blocked_rects`;
+        tính lại khi lưới đổi.
+        """
+        return self.grid.derived('collision_rects', self._build_collision_rects)
+
+    def _build_collision_rects(self, grid):
+        rects = merge_blocked_rects(grid.cells, grid.rows, grid.cols, grid.stride, grid.stride + 1)
+        return [self._pixel_rect(*rect) for rect in rects]
+
+    def _pixel_rect(self, col, row, width, height):
+        size = self.tile_size
+        return pygame.Rect(col * size, row * size, width * size, height * size)
+
+    def blocked_rects_in(self, area):
+        """Các hình chữ nhật vật cản (pixel) chồng lên vùng `area` (pygame.Rect)."""
+        rects = self.collision_rects()
+        return [rects[i] for i in area.collidelistall(rects)]
+
+    def draw_debug(self, surface, camera):
+        """Vẽ viền các hình chữ nhật vật cản nằm trong tầm nhìn camera (bật/tắt bằng F1)."""
+        for rect in self.blocked_rects_in(camera.camera_rect):
+            pygame.draw.rect(surface, config.RED, camera.apply_rect(rect), 1)
@@ -6,12 +6,11 @@ import pygame_gui
 import random
 
 import src.config as config
-from src.utils.file_handle import load_csv
 from src.core.player import Player
 from src.pathfinding.pathfinder import PathFinder
 from src.core.point_manager import PointManager
 from src.core.camera import Camera
-from src.core.title import Tile
+from src.core.world_map import WorldMap
 from src.minigames.eight_puzzle_game import EightPuzzleGame
 from src.minigames.snake_game import SnakeGame
 from src.minigames.mouse_cheese_game import MouseCheeseGame
@@ -63,22 +62,22 @@ class Game:
             self.player.animation_timer = 0.0
 
         if self.camera is None:
-            self.camera = Camera(self.world_pixel_width, self.world_pixel_height)
+            self.camera = Camera(self.world_map.pixel_width, self.world_map.pixel_height)
         self.camera.update(self.player)
 
         if self.point_manager is None:
-            self.point_manager = PointManager(self.entity_data)
+            self.point_manager = PointManager(self.world_map)
         else:
             if hasattr(self.point_manager, 'reset'):
-                self.point_manager.reset(self.entity_data)
+                self.point_manager.reset(self.world_map)
             else:
-                self.point_manager = PointManager(self.entity_data)
+                self.point_manager = PointManager(self.world_map)
 
         if self.path_finder is None:
-            self.path_finder = PathFinder(self.floor_block_data, self.ui_manager, self.player, self.point_manager)
+            self.path_finder = PathFinder(self.world_map, self.ui_manager, self.player, self.point_manager)
         else:
             self.path_finder.player = self.player
-            self.path_finder.point_manager = self.point_manager
+            self.path_finder.attach_point_manager(self.point_manager)
             if self.path_finder.input_active: self.path_finder.disable_input()
 
         self._initialize_minigames_instances()
@@ -114,34 +113,22 @@ class Game:
             print(f"Lỗi tải ảnh nền '{config.MAP_IMAGE_PATH}': {e}"); pygame.quit(); sys.exit()
 
     def _setup_map_and_world(self):
-        self.floor_block_data = load_csv(config.FLOOR_BLOCK_CSV_PATH)
-        self.entity_data = load_csv(config.ENTITY_CSV_PATH)
-        num_rows = len(self.floor_block_data)
-        num_cols = max(len(r) for r in self.floor_block_data if r) if num_rows > 0 and any(r for r in self.floor_block_data) else 0
-        if num_rows == 0 or num_cols == 0:
+        self.world_map = WorldMap.load(config.FLOOR_BLOCK_CSV_PATH, config.ENTITY_CSV_PATH, config.MAP_BUNDLE_PATH)
+        if self.world_map.rows == 0 or self.world_map.cols == 0:
             print("Lỗi: Dữ liệu bản đồ không hợp lệ."); pygame.quit(); sys.exit()
-        
-        self.world_pixel_width = num_cols * config.TILE_SIZE
-        self.world_pixel_height = num_rows * config.TILE_SIZE
-        self.collidable_tiles = pygame.sprite.Group()
-        for r_idx, row_data in enumerate(self.floor_block_data):
-            for c_idx, tile_value in enumerate(row_data):
-                if tile_value.strip() not in ['-1', '']:
-                    self.collidable_tiles.add(Tile(c_idx * config.TILE_SIZE, r_idx * config.TILE_SIZE, config.TILE_SIZE))
 
     def _determine_player_start_pos(self):
         start_x, start_y = config.TILE_SIZE, config.TILE_SIZE
         found = False
-        if not hasattr(self, 'entity_data') or not self.entity_data:
-            print("Lỗi: entity_data chưa được tải khi xác định vị trí người chơi.")
+        if not hasattr(self, 'world_map') or not self.world_map:
+            print("Lỗi: world_map chưa được tải khi xác định vị trí người chơi.")
             return start_x, start_y
 
-        for r_idx, row in enumerate(self.entity_data):
-            for c_idx, val in enumerate(row):
-                if val.strip() == config.PLAYER_ENTITY_ID:
-                    start_x, start_y = c_idx * config.TILE_SIZE, r_idx * config.TILE_SIZE
-                    found = True; break
-            if found: break
+        player_positions = self.world_map.entity_positions(config.PLAYER_ENTITY_ID)
+        if player_positions:
+            r_idx, c_idx = player_positions[0]
+            start_x, start_y = c_idx * config.TILE_SIZE, r_idx * config.TILE_SIZE
+            found = True
         if not found: print(f"CẢNH BÁO: Không tìm thấy ID người chơi '{config.PLAYER_ENTITY_ID}'.")
         return start_x, start_y
 
@@ -268,6 +255,7 @@ class Game:
                 
                 if self.current_game_state == config.ST_PLAYING_MAIN:
                     if event.key == pygame.K_F1: self.debug_draw_tiles = not self.debug_draw_tiles
+                    if event.key == pygame.K_F2 and self.path_finder: self.path_finder.toggle_metrics_overlay()
                     if event.key == pygame.K_p and (not self.path_finder or not self.path_finder.input_active):
                         if self.point_manager and self.point_manager.is_visible and self.point_manager.current_point_center:
                             if self.path_finder: self.path_finder.enable_input()
@@ -429,8 +417,9 @@ class Game:
         if is_game_won_or_over: return
 
         if self.current_game_state == config.ST_PLAYING_MAIN:
-            self.player.update(self.collidable_tiles, time_delta)
+            self.player.update(self.world_map, time_delta)
             self.camera.update(self.player)
+            self.path_finder.update(time_delta)
             is_at_point_for_auto, _ = self.point_manager.is_player_at_point_for_auto_puzzle(self.player.rect.center)
             if is_at_point_for_auto and not self.current_minigame_instance and not self.minigame_selector.is_visible and not self.training_input_window:
                 if self.all_minigame_instances:
@@ -474,12 +463,13 @@ class Game:
                                self.current_game_state == config.ST_GAME_OVER_MONEY)
 
         if self.debug_draw_tiles and self.current_game_state == config.ST_PLAYING_MAIN and not is_game_won_or_over:
-            for tile_sprite in self.collidable_tiles:
-                tile_sprite.draw(self.screen, self.camera)
+            self.world_map.draw_debug(self.screen, self.camera)
 
         if not is_game_won_or_over:
             self.point_manager.draw(self.screen, self.camera)
             self.player.draw(self.screen, self.camera)
+            if self.current_game_state == config.ST_PLAYING_MAIN:
+                self.path_finder.draw(self.screen)
 
         if self.current_game_state == config.ST_PLAYING_PUZZLE and self.current_minigame_instance and self.current_minigame_instance.is_active:
             self.current_minigame_instance.draw(self.screen, self.main_game_time_remaining)
@@ -534,4 +524,6 @@ class Game:
             self.minigame_selector.kill()
         if self.training_input_window:
             self._cleanup_training_input_ui()
+        if self.path_finder:
+            self.path_finder.shutdown()
         pygame.quit()
\ No newline at end of file
@@ -0,0 +1,384 @@
+"""
+Đo hiệu năng tìm đường không cần cửa sổ pygame.
+
+Cách chạy (từ thư mục gốc dự án):
+    python -m src.pathfinding.benchmark hpa --sizes 64 128 256 512
+    python -m src.pathfinding.benchmark suite --sizes 64 256 1024 --output bench.json
+    python -m src.pathfinding.benchmark wavefront --sizes 256 1024
+"""
+import os
+
+# WorldMap kéo theo pygame; tắt dòng chào của pygame để stdout chỉ còn JSON.
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import src.config as config
+from src.core.world_map import WorldMap
+from .distance_field import DistanceField
+from .grid_map import GridMap
+from .hierarchical import HierarchicalGraph
+from .pathfinding_algorithms import ALGORITHM_MAP, ALGORITHM_STEP_MAP, PathfindingAlgorithms, algorithm_kwargs
+from .wavefront import wavefront_distances
+
+MAP_KINDS = ("maze", "cave", "open")
+
+
+def _grid_from_blocked(blocked):
+    """Tạo GridMap từ mảng numpy 2 chiều (khác 0 = vật cản) mà không đi qua list-of-lists."""
+    rows, cols = blocked.shape
+    grid = GridMap(rows, cols)
+    blocked = (blocked != 0).astype(np.uint8)
+    for r in range(rows):
+        row_start = (r + 1) * grid.stride + 1
+        grid.cells[row_start:row_start + cols] = blocked[r].tobytes()
+    return grid
+
+
+def make_open_field(size, obstacle_ratio, seed):
+    """Bản đồ vuông với vật cản rải ngẫu nhiên."""
+    rng = np.random.default_rng(seed)
+    return _grid_from_blocked(rng.random((size, size)) < obstacle_ratio)
+
+
+def make_maze(size, seed):
+    """Mê cung hoàn hảo (DFS quay lui) với hành lang rộng một ô."""
+    rng = random.Random(seed)
+    blocked = np.ones((size, size), dtype=np.uint8)
+    cell_rows, cell_cols = (size + 1) // 2, (size + 1) // 2
+    seen = bytearray(cell_rows * cell_cols)
+    blocked[0, 0] = 0
+    seen[0] = 1
+    stack = [(0, 0)]
+    while stack:
+        r, c = stack[-1]
+        options = [(nr, nc) for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                   if 0 <= nr < cell_rows and 0 <= nc < cell_cols and not seen[nr * cell_cols + nc]]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc = rng.choice(options)
+        seen[nr * cell_cols + nc] = 1
+        blocked[r + nr, c + nc] = 0
+        blocked[2 * nr, 2 * nc] = 0
+        stack.append((nr, nc))
+    return _grid_from_blocked(blocked)
+
+
+def make_cave(size, seed, fill_ratio=0.45, smoothing_steps=4):
+    """Hang động sinh bằng automat tế bào: ô thành vật cản nếu có từ 5 vật cản trở lên trong 3x3."""
+    rng = np.random.default_rng(seed)
+    blocked = (rng.random((size, size)) < fill_ratio).astype(np.uint8)
+    for _ in range(smoothing_steps):
+        padded = np.pad(blocked, 1, constant_values=1)
+        walls = sum(padded[1 + dr:1 + dr + size, 1 + dc:1 + dc + size]
+                    for dr in (-1, 0, 1) for dc in (-1, 0, 1))
+        blocked = (walls >= 5).astype(np.uint8)
+    return _grid_from_blocked(blocked)
+
+
+def make_map(kind, size, seed, obstacle_ratio=0.2):
+    if kind == "maze":
+        return make_maze(size, seed)
+    if kind == "cave":
+        return make_cave(size, seed)
+    if kind == "open":
+        return make_open_field(size, obstacle_ratio, seed)
+    raise ValueError(f"Loại bản đồ không hợp lệ: {kind}")
+
+
+def load_floor_grid():
+    """Lưới của bản đồ thật, nạp qua WorldMap (bundle biên dịch sẵn) giống hệt lúc chạy game."""
+    return WorldMap.load().grid
+
+
+def sample_pairs(grid, count, seed):
+    """Chọn ngẫu nhiên (có seed) các cặp điểm đầu/đích đi được."""
+    rng = random.Random(seed)
+    free_cells = np.flatnonzero(np.frombuffer(bytes(grid.cells), dtype=np.uint8) == GridMap.FREE)
+    if len(free_cells) == 0:
+        return []
+    return [(grid.coords(int(free_cells[rng.randrange(len(free_cells))])),
+             grid.coords(int(free_cells[rng.randrange(len(free_cells))])))
+            for _ in range(count)]
+
+
+def benchmark_hpa(sizes, queries, obstacle_ratio, seed):
+    """So sánh thời gian truy vấn HPA* với A* phẳng khi bản đồ lớn dần."""
+    rows = []
+    for size in sizes:
+        grid = make_open_field(size, obstacle_ratio, seed)
+        build_start = time.perf_counter()
+        graph = HierarchicalGraph(grid)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        a_star_ms, hpa_ms, optimal_lengths, hpa_lengths = [], [], 0, 0
+        for start, goal in sample_pairs(grid, queries, seed):
+            t0 = time.perf_counter()
+            optimal_path, _ = PathfindingAlgorithms.a_star(grid, start, goal)
+            t1 = time.perf_counter()
+            hpa_path, _ = graph.find_path(start, goal)
+            t2 = time.perf_counter()
+            a_star_ms.append((t1 - t0) * 1000)
+            hpa_ms.append((t2 - t1) * 1000)
+            if optimal_path:
+                optimal_lengths += len(optimal_path)
+                hpa_lengths += len(hpa_path)
+
+        rows.append({
+            'size': size,
+            'hpa_nodes': graph.node_count,
+            'hpa_build_ms': round(build_ms, 2),
+            'a_star_mean_ms': round(statistics.mean(a_star_ms), 3),
+            'hpa_mean_ms': round(statistics.mean(hpa_ms), 3),
+            'hpa_length_ratio': round(hpa_lengths / optimal_lengths, 4) if optimal_lengths else None,
+        })
+    return rows
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    position = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[position]
+
+
+def _max_slice_ms(steps):
+    """Thời gian dài nhất (ms) giữa hai lần nhả quyền của một generator `*_steps`, tính cả lát đầu và lát cuối."""
+    worst = 0.0
+    while True:
+        t0 = time.perf_counter()
+        try:
+            next(steps)
+        except StopIteration:
+            return max(worst, (time.perf_counter() - t0) * 1000)
+        worst = max(worst, (time.perf_counter() - t0) * 1000)
+
+
+def benchmark_grid(grid, pairs, algorithms, memory_queries=3):
+    """
+    Chạy mọi cặp điểm qua từng thuật toán trên một lưới, với cùng tham số config như trong game.
+
+    Độ dài tối ưu lấy từ BFS hai chiều; mỗi thuật toán được chạy nháp một lần trước khi
+    đo để các cấu trúc dựng sẵn (HPA*, workspace) không bị tính vào truy vấn đầu tiên.
+    Lượt nháp chạy với pool workspace rỗng; số byte workspace mà thuật toán giữ lại trong
+    pool được báo riêng ở `workspace_pool_kib`, vì `peak_memory_kib` đo sau lượt nháp nên
+    không gồm các mảng này.
+    Bộ nhớ đỉnh đo bằng tracemalloc trên `memory_queries` cặp đầu tiên, ở một lượt chạy
+    riêng vì tracemalloc làm chậm chương trình nhiều lần. `max_slice_ms` là lát chạy dài
+    nhất giữa hai lần nhả quyền khi chạy theo khung hình (PATHFINDING_SLICE_NODES nút mỗi
+    lát); None với thuật toán không chia nhỏ được.
+    """
+    optimal_lengths = [len(PathfindingAlgorithms.bidirectional_bfs(grid, start, goal)[0]) for start, goal in pairs]
+    results = []
+    for algo_name in algorithms:
+        print(f"[benchmark]   {algo_name}", file=sys.stderr)
+        algo_func = ALGORITHM_MAP[algo_name]
+        kwargs = algorithm_kwargs(algo_name, grid)
+        grid.clear_workspaces()
+        if pairs:
+            algo_func(grid, *pairs[0], **kwargs)
+        workspace_pool_kib = round(grid.workspace_pool_bytes() / 1024, 1)
+
+        times_ms, expansions, extra_steps, ratios = [], [], [], []
+        found = reachable = 0
+        for (start, goal), optimal_length in zip(pairs, optimal_lengths):
+            t0 = time.perf_counter()
+            path, visited_count = algo_func(grid, start, goal, **kwargs)
+            times_ms.append((time.perf_counter() - t0) * 1000)
+            expansions.append(visited_count)
+            if optimal_length:
+                reachable += 1
+                if path:
+                    found += 1
+                    extra_steps.append(len(path) - optimal_length)
+                    ratios.append(len(path) / optimal_length)
+
+        max_slice_ms = None
+        steps_func = ALGORITHM_STEP_MAP.get(algo_name)
+        if steps_func is not None and pairs:
+            max_slice_ms = round(max(_max_slice_ms(steps_func(grid, start, goal, **kwargs)) for start, goal in pairs), 3)
+
+        peak_kib = None
+        if memory_queries > 0 and pairs:
+            peak = 0
+            tracemalloc.start()
+            for start, goal in pairs[:memory_queries]:
+                tracemalloc.reset_peak()
+                algo_func(grid, start, goal, **kwargs)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            peak_kib = round(peak / 1024, 1)
+
+        times_ms.sort()
+        results.append({
+            'algorithm': algo_name,
+            'queries': len(pairs),
+            'reachable': reachable,
+            'found': found,
+            'time_ms': {
+                'mean': round(statistics.mean(times_ms), 3) if times_ms else None,
+                'p50': round(_percentile(times_ms, 0.5), 3) if times_ms else None,
+                'p90': round(_percentile(times_ms, 0.9), 3) if times_ms else None,
+                'p99': round(_percentile(times_ms, 0.99), 3) if times_ms else None,
+                'max': round(times_ms[-1], 3) if times_ms else None,
+            },
+            'expansions': {
+                'mean': round(statistics.mean(expansions), 1) if expansions else None,
+                'max': max(expansions) if expansions else None,
+            },
+            'optimality_gap': {
+                'mean_ratio': round(statistics.mean(ratios), 4) if ratios else None,
+                'max_extra_steps': max(extra_steps) if extra_steps else None,
+                'optimal_fraction': round(extra_steps.count(0) / len(extra_steps), 4) if extra_steps else None,
+            },
+            'max_slice_ms': max_slice_ms,
+            'peak_memory_kib': peak_kib,
+            'workspace_pool_kib': workspace_pool_kib,
+        })
+    return results
+
+
+def benchmark_suite(sizes, kinds, algorithms, queries, seed, include_floor=True, memory_queries=3):
+    """Bộ đo đầy đủ: bản đồ thật cộng các bản đồ sinh ngẫu nhiên, trả về dict sẵn sàng ghi JSON."""
+    maps = []
+    if include_floor:
+        maps.append(("floor", None, load_floor_grid))
+    for size in sizes:
+        for kind in kinds:
+            maps.append((kind, size, lambda kind=kind, size=size: make_map(kind, size, seed)))
+
+    report = {
+        'meta': {
+            'seed': seed,
+            'queries': queries,
+            'memory_queries': memory_queries,
+            'python': platform.python_version(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'maps': [],
+    }
+    for kind, size, build in maps:
+        build_start = time.perf_counter()
+        grid = build()
+        build_ms = (time.perf_counter() - build_start) * 1000
+        print(f"[benchmark] {kind} {grid.rows}x{grid.cols} ...", file=sys.stderr)
+        pairs = sample_pairs(grid, queries, seed)
+        report['maps'].append({
+            'kind': kind,
+            'rows': grid.rows,
+            'cols': grid.cols,
+            'free_cells': grid.size - sum(grid.cells),
+            'build_ms': round(build_ms, 2),
+            'results': benchmark_grid(grid, pairs, algorithms, memory_queries),
+        })
+    return report
+
+
+def benchmark_wavefront(sizes, kinds, sources, seed, include_floor=True):
+    """
+    So sánh BFS toàn bản đồ bằng NumPy với `bfs` hiện có (chạy tới ô xa nhất nên duyệt
+    gần hết vùng liên thông) và với BFS deque dựng DistanceField; kiểm tra kết quả trùng khớp.
+    """
+    maps = [("floor", load_floor_grid)] if include_floor else []
+    for size in sizes:
+        for kind in kinds:
+            maps.append((f"{kind}{size}", lambda kind=kind, size=size: make_map(kind, size, seed)))
+
+    rows = []
+    for name, build in maps:
+        grid = build()
+        bfs_ms, field_ms, wavefront_ms, matches = [], [], [], True
+        for source, _ in sample_pairs(grid, sources, seed):
+            t0 = time.perf_counter()
+            distance = wavefront_distances(grid, source, padded=True)
+            t1 = time.perf_counter()
+            field = DistanceField(grid, source)
+            t2 = time.perf_counter()
+            farthest = grid.coords(int(distance.argmax()))
+            PathfindingAlgorithms.bfs(grid, source, farthest)
+            t3 = time.perf_counter()
+            wavefront_ms.append((t1 - t0) * 1000)
+            field_ms.append((t2 - t1) * 1000)
+            bfs_ms.append((t3 - t2) * 1000)
+            matches = matches and np.array_equal(distance, np.frombuffer(field.distance, dtype=np.int32))
+        if not wavefront_ms:
+            continue
+        rows.append({
+            'map': name,
+            'cells': grid.rows * grid.cols,
+            'bfs_ms': round(statistics.mean(bfs_ms), 2),
+            'field_bfs_ms': round(statistics.mean(field_ms), 2),
+            'wavefront_ms': round(statistics.mean(wavefront_ms), 2),
+            'speedup_vs_bfs': round(statistics.mean(bfs_ms) / statistics.mean(wavefront_ms), 2),
+            'match': matches,
+        })
+    return rows
+
+
+def _print_table(rows):
+    if not rows:
+        return
+    headers = list(rows[0].keys())
+    print("  ".join(f"{h:>16}" for h in headers))
+    for row in rows:
+        print("  ".join(f"{str(row[h]):>16}" for h in headers))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark các thuật toán tìm đường.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    hpa_parser = subparsers.add_parser("hpa", help="So sánh HPA* với A* phẳng theo kích thước bản đồ.")
+    hpa_parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256, 512])
+    hpa_parser.add_argument("--queries", type=int, default=20)
+    hpa_parser.add_argument("--obstacles", type=float, default=0.2)
+    hpa_parser.add_argument("--seed", type=int, default=1)
+
+    suite_parser = subparsers.add_parser("suite", help="Chạy mọi thuật toán trên bản đồ thật và bản đồ sinh ngẫu nhiên, xuất JSON.")
+    suite_parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256],
+                              help="Cạnh bản đồ sinh ngẫu nhiên, từ 64 tới 4096.")
+    suite_parser.add_argument("--kinds", nargs="+", choices=MAP_KINDS, default=list(MAP_KINDS))
+    suite_parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHM_MAP), default=list(ALGORITHM_MAP))
+    suite_parser.add_argument("--queries", type=int, default=20)
+    suite_parser.add_argument("--seed", type=int, default=1)
+    suite_parser.add_argument("--no-floor", action="store_true", help="Bỏ qua map_floorblock.csv.")
+    suite_parser.add_argument("--memory-queries", type=int, default=3,
+                              help="Số cặp điểm đo bộ nhớ đỉnh bằng tracemalloc (0 = không đo).")
+    suite_parser.add_argument("--output", help="File JSON đầu ra (mặc định in ra stdout).")
+
+    wavefront_parser = subparsers.add_parser("wavefront", help="So sánh BFS toàn bản đồ bằng NumPy với bfs hiện có.")
+    wavefront_parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024])
+    wavefront_parser.add_argument("--kinds", nargs="+", choices=MAP_KINDS, default=list(MAP_KINDS))
+    wavefront_parser.add_argument("--sources", type=int, default=5)
+    wavefront_parser.add_argument("--seed", type=int, default=1)
+    wavefront_parser.add_argument("--no-floor", action="store_true", help="Bỏ qua map_floorblock.csv.")
+
+    args = parser.parse_args(argv)
+    if args.command == "hpa":
+        _print_table(benchmark_hpa(args.sizes, args.queries, args.obstacles, args.seed))
+    elif args.command == "wavefront":
+        _print_table(benchmark_wavefront(args.sizes, args.kinds, args.sources, args.seed,
+                                         include_floor=not args.no_floor))
+    elif args.command == "suite":
+        report = benchmark_suite(args.sizes, args.kinds, args.algorithms, args.queries, args.seed,
+                                 include_floor=not args.no_floor, memory_queries=args.memory_queries)
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                file.write(text)
+        else:
+            print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from array import array
+from collections import deque
+
+from .grid_map import as_grid_map
+
+
+class ComponentLabels:
+    """
+    Nhãn vùng liên thông (4 hướng) của mọi ô đi được.
+
+    `labels[idx]` là số hiệu vùng (bắt đầu từ 1) theo chỉ số có viền của GridMap, 0
+    với vật cản. Hai ô có đường đi tới nhau khi và chỉ khi cùng nhãn, nên một truy vấn
+    tới vùng khác có thể bị loại trong O(1) mà không cần chạy thuật toán tìm đường nào.
+    """
+
+    def __init__(self, grid):
+        self.grid = as_grid_map(grid)
+        self.labels = array('i', [0]) * self.grid.size
+        # sizes[label] = số ô của vùng; phần tử 0 dành cho vật cản.
+        self.sizes = [0]
+        self.first_cells = [-1]
+        self._label_components()
+
+    def _label_components(self):
+        grid, labels = self.grid, self.labels
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        for idx in range(grid.size):
+            if cells[idx] != 0 or labels[idx]:
+                continue
+            label = len(self.sizes)
+            labels[idx] = label
+            queue = deque([idx])
+            size = 0
+            while queue:
+                current = queue.popleft()
+                size += 1
+                for offset in offsets:
+                    neighbor = current + offset
+                    if cells[neighbor] == 0 and not labels[neighbor]:
+                        labels[neighbor] = label
+                        queue.append(neighbor)
+            self.sizes.append(size)
+            self.first_cells.append(idx)
+
+    @property
+    def count(self):
+        return len(self.sizes) - 1
+
+    def label_of(self, row, col):
+        """Nhãn vùng của ô (r, c); 0 nếu ô là vật cản hoặc nằm ngoài lưới."""
+        if not self.grid.in_bounds(row, col):
+            return 0
+        return self.labels[self.grid.index(row, col)]
+
+    def connected(self, start, goal):
+        """True nếu có đường đi giữa hai ô (r, c) đều đi được."""
+        start_label = self.label_of(*start)
+        return start_label != 0 and start_label == self.label_of(*goal)
+
+    def largest_component_cell(self):
+        """Chỉ số (có viền) của ô đầu tiên thuộc vùng lớn nhất, -1 nếu lưới không có ô đi được."""
+        if self.count == 0:
+            return -1
+        best = max(range(1, len(self.sizes)), key=self.sizes.__getitem__)
+        return self.first_cells[best]
+
+
+def component_labels_for(grid):
+    """Nhãn vùng liên thông của lưới, tính một lần và tính lại khi lưới thay đổi."""
+    grid = as_grid_map(grid)
+    return grid.derived('components', ComponentLabels)
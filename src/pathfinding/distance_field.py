@@ -0,0 +1,151 @@
+import os
+import struct
+import zlib
+from array import array
+from collections import deque
+
+from .grid_map import as_grid_map
+from .metrics import note_peak_open
+
+PRECOMPUTED_ROUTE_NAME = "Tuyến định sẵn"
+PRECOMPUTED_ROUTE_INFO = "Đọc đường ngắn nhất từ bản đồ khoảng cách tính sẵn cho điểm giao hàng, không cần tìm kiếm."
+
+_FILE_MAGIC = b'PFDF'
+_FILE_VERSION = 1
+_HEADER = struct.Struct('<4sHiiIi')
+_TARGET = struct.Struct('<ii')
+
+
+class DistanceField:
+    """
+    Bản đồ khoảng cách và bước kế tiếp tới một ô đích cố định.
+
+    Được tính một lần bằng BFS ngược từ đích; sau đó đường ngắn nhất từ bất kỳ
+    ô nào chỉ là việc lần theo `next_hop`, tốn O(độ dài đường).
+    """
+
+    def __init__(self, grid, target, distance=None, next_hop=None):
+        self.grid = grid
+        self.target = tuple(target)
+        self.target_idx = grid.index(*target)
+        self.version = grid.version
+        if distance is None or next_hop is None:
+            distance, next_hop = self._build()
+        self.distance = distance
+        self.next_hop = next_hop
+
+    def _build(self):
+        grid = self.grid
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        distance = array('i', [-1]) * grid.size
+        next_hop = array('i', [-1]) * grid.size
+        if cells[self.target_idx] != 0:
+            return distance, next_hop
+
+        distance[self.target_idx] = 0
+        queue = deque([self.target_idx])
+        while queue:
+            current = queue.popleft()
+            next_dist = distance[current] + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if cells[neighbor] == 0 and distance[neighbor] == -1:
+                    distance[neighbor] = next_dist
+                    next_hop[neighbor] = current
+                    queue.append(neighbor)
+        return distance, next_hop
+
+    def is_stale(self):
+        return self.version != self.grid.version
+
+    def distance_from(self, row, col):
+        """Số bước từ (row, col) tới đích, hoặc -1 nếu không tới được."""
+        if not self.grid.in_bounds(row, col):
+            return -1
+        return self.distance[self.grid.index(row, col)]
+
+    def path_from(self, start):
+        """Đường ngắn nhất từ `start` tới đích dưới dạng danh sách (r, c)."""
+        grid = self.grid
+        if not grid.in_bounds(*start):
+            return []
+        idx = grid.index(*start)
+        if self.distance[idx] == -1:
+            return []
+        next_hop = self.next_hop
+        path = [grid.coords(idx)]
+        while idx != self.target_idx:
+            idx = next_hop[idx]
+            path.append(grid.coords(idx))
+        return path
+
+
+class DistanceFieldSet:
+    """Tập các DistanceField theo ô đích, tự tính lại khi lưới thay đổi."""
+
+    def __init__(self, grid):
+        self.grid = as_grid_map(grid)
+        self.fields = {}
+
+    def build(self, targets):
+        for target in targets:
+            self.get(target)
+
+    def get(self, target):
+        target = tuple(target)
+        field = self.fields.get(target)
+        if field is None or field.is_stale():
+            field = DistanceField(self.grid, target)
+            self.fields[target] = field
+        return field
+
+    def has(self, target):
+        return tuple(target) in self.fields
+
+    def route(self, grid, start, goal):
+        """
+        Cùng hợp đồng `(path, visited_count)` với các hàm trong ALGORITHM_MAP.
+        `visited_count` là số ô được đọc khi lần theo bước kế tiếp.
+        """
+        if not self.has(goal):
+            return [], 0
+        path = self.get(goal).path_from(tuple(start))
+        note_peak_open(0)
+        return path, len(path)
+
+    def _grid_checksum(self):
+        return zlib.crc32(self.grid.cells)
+
+    def save(self, file_path):
+        """Ghi các trường khoảng cách ra file nhị phân để lần chạy sau khỏi phải tính lại."""
+        fields = [field for field in self.fields.values() if not field.is_stale()]
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        with open(file_path, 'wb') as file:
+            file.write(_HEADER.pack(_FILE_MAGIC, _FILE_VERSION, self.grid.rows, self.grid.cols,
+                                    self._grid_checksum(), len(fields)))
+            for field in fields:
+                file.write(_TARGET.pack(*field.target))
+                field.distance.tofile(file)
+                field.next_hop.tofile(file)
+
+    def load(self, file_path):
+        """Nạp các trường đã lưu; bỏ qua file nếu không khớp với lưới hiện tại."""
+        if not os.path.exists(file_path):
+            return False
+        try:
+            with open(file_path, 'rb') as file:
+                magic, version, rows, cols, checksum, count = _HEADER.unpack(file.read(_HEADER.size))
+                if (magic != _FILE_MAGIC or version != _FILE_VERSION or rows != self.grid.rows or
+                        cols != self.grid.cols or checksum != self._grid_checksum()):
+                    return False
+                for _ in range(count):
+                    target = _TARGET.unpack(file.read(_TARGET.size))
+                    distance = array('i')
+                    distance.fromfile(file, self.grid.size)
+                    next_hop = array('i')
+                    next_hop.fromfile(file, self.grid.size)
+                    self.fields[target] = DistanceField(self.grid, target, distance, next_hop)
+        except (OSError, EOFError, struct.error) as e:
+            print(f"Cảnh báo: Không đọc được file bản đồ khoảng cách '{file_path}': {e}")
+            return False
+        return True
@@ -0,0 +1,174 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from .search_workspace import SearchWorkspace
+
+
+# _BIT_ROWS[b] là 8 byte 0/1 ứng với 8 bit của b (bit thấp trước), dùng để bung bitset thành ô.
+_BIT_ROWS = [bytes((b >> i) & 1 for i in range(8)) for b in range(256)]
+
+
+class GridMap:
+    """
+    Lưới ô phẳng dùng chung cho mọi thuật toán tìm đường.
+
+    Các ô được lưu trong một bytearray một chiều (0 = đi được, 1 = vật cản) có
+    thêm một viền vật cản bao quanh bản đồ. Nhờ viền này, láng giềng của ô `idx`
+    luôn là `idx + offset` với `offset` trong `neighbor_offsets`, không cần kiểm
+    tra biên và không phải tạo tuple (r, c) cho mỗi lần duyệt.
+    """
+
+    FREE = 0
+    BLOCKED = 1
+    # Số thay đổi ô gần nhất được ghi lại cho các bộ tìm đường tăng dần.
+    CHANGE_LOG_SIZE = 4096
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.stride = cols + 2
+        self.size = (rows + 2) * self.stride
+        self.cells = bytearray([self.BLOCKED]) * self.size
+        free_row = bytearray(cols)
+        for r in range(rows):
+            row_start = (r + 1) * self.stride + 1
+            self.cells[row_start:row_start + cols] = free_row
+        # Cùng thứ tự với các hướng cũ: lên, xuống, trái, phải.
+        self.neighbor_offsets = (-self.stride, self.stride, -1, 1)
+        self.version = 0
+        self._change_log = deque(maxlen=self.CHANGE_LOG_SIZE)
+        self._workspace_pool = []
+        self._workspace_lock = threading.Lock()
+        self._derived = {}
+
+    @classmethod
+    def from_rows(cls, grid_rows):
+        """Tạo GridMap từ lưới list-of-lists (0 = đi được, khác 0 = vật cản)."""
+        rows = len(grid_rows)
+        cols = max((len(row) for row in grid_rows), default=0)
+        grid = cls(rows, cols)
+        for r, row in enumerate(grid_rows):
+            row_start = (r + 1) * grid.stride + 1
+            for c, value in enumerate(row):
+                if value:
+                    grid.cells[row_start + c] = cls.BLOCKED
+            for c in range(len(row), cols):
+                grid.cells[row_start + c] = cls.BLOCKED
+        return grid
+
+    @classmethod
+    def from_floor_data(cls, floor_block_data):
+        """Tạo GridMap từ dữ liệu CSV của lớp floorblock ('-1' hoặc rỗng = đi được)."""
+        rows = len(floor_block_data)
+        cols = max((len(row) for row in floor_block_data), default=0)
+        grid = cls(rows, cols)
+        for r, row_data in enumerate(floor_block_data):
+            row_start = (r + 1) * grid.stride + 1
+            for c, value in enumerate(row_data):
+                val_str = value.strip()
+                if val_str != '-1' and val_str != '':
+                    grid.cells[row_start + c] = cls.BLOCKED
+            for c in range(len(row_data), cols):
+                grid.cells[row_start + c] = cls.BLOCKED
+        return grid
+
+    @classmethod
+    def from_passability(cls, rows, cols, bits):
+        """Tạo GridMap từ bitset vật cản rows*cols (bit `r*cols + c`, bit thấp trước) của MapBundle."""
+        grid = cls(rows, cols)
+        flat = b''.join(_BIT_ROWS[byte] for byte in bytes(bits))
+        for r in range(rows):
+            row_start = (r + 1) * grid.stride + 1
+            grid.cells[row_start:row_start + cols] = flat[r * cols:(r + 1) * cols]
+        return grid
+
+    def index(self, row, col):
+        return (row + 1) * self.stride + col + 1
+
+    def coords(self, idx):
+        row, col = divmod(idx, self.stride)
+        return row - 1, col - 1
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def is_walkable(self, row, col):
+        return self.in_bounds(row, col) and self.cells[self.index(row, col)] == self.FREE
+
+    def set_blocked(self, row, col, blocked=True):
+        """Đổi trạng thái một ô và tăng `version` nếu lưới thực sự thay đổi."""
+        if not self.in_bounds(row, col):
+            return False
+        idx = self.index(row, col)
+        new_value = self.BLOCKED if blocked else self.FREE
+        if self.cells[idx] == new_value:
+            return False
+        self.cells[idx] = new_value
+        self.version += 1
+        self._change_log.append((self.version, idx))
+        return True
+
+    def changes_since(self, version):
+        """
+        Chỉ số các ô đã đổi sau `version`, hoặc None nếu nhật ký thay đổi không còn
+        đủ xa để trả lời (khi đó nơi gọi phải tính lại từ đầu).
+        """
+        if version == self.version:
+            return []
+        if version > self.version or not self._change_log or self._change_log[0][0] > version + 1:
+            return None
+        return [idx for changed_version, idx in self._change_log if changed_version > version]
+
+    def derived(self, key, factory):
+        """
+        Trả về cấu trúc dẫn xuất từ lưới (ví dụ đồ thị phân cấp), tạo bằng
+        `factory(self)` ở lần đầu và tạo lại mỗi khi `version` của lưới thay đổi.
+        """
+        entry = self._derived.get(key)
+        if entry is not None and entry[0] == self.version:
+            return entry[1]
+        value = factory(self)
+        self._derived[key] = (self.version, value)
+        return value
+
+    def reserve_workspaces(self, count):
+        """
+        Cấp phát trước cho pool đủ `count` SearchWorkspace rảnh, để các lượt tìm kiếm chạy
+        theo khung hình không phải cấp phát mảng cỡ toàn bản đồ ngay trong lát đầu tiên.
+        """
+        with self._workspace_lock:
+            missing = count - len(self._workspace_pool)
+        reserved = [SearchWorkspace(self.size) for _ in range(missing)]
+        with self._workspace_lock:
+            self._workspace_pool.extend(reserved)
+
+    def clear_workspaces(self):
+        """Bỏ mọi SearchWorkspace rảnh trong pool (ví dụ để đo lại bộ nhớ từ đầu)."""
+        with self._workspace_lock:
+            self._workspace_pool.clear()
+
+    def workspace_pool_bytes(self):
+        """Tổng số byte của các SearchWorkspace đang rảnh trong pool."""
+        with self._workspace_lock:
+            return sum(ws.nbytes for ws in self._workspace_pool)
+
+    @contextmanager
+    def workspace(self):
+        """Mượn một SearchWorkspace từ pool của lưới; tự trả lại khi kết thúc."""
+        with self._workspace_lock:
+            ws = self._workspace_pool.pop() if self._workspace_pool else None
+        if ws is None:
+            ws = SearchWorkspace(self.size)
+        try:
+            yield ws
+        finally:
+            with self._workspace_lock:
+                self._workspace_pool.append(ws)
+
+
+def as_grid_map(grid):
+    """Chấp nhận GridMap hoặc lưới list-of-lists cũ và luôn trả về GridMap."""
+    if isinstance(grid, GridMap):
+        return grid
+    return GridMap.from_rows(grid)
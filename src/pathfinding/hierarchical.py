@@ -0,0 +1,266 @@
+import heapq
+import threading
+from collections import OrderedDict, deque
+
+import src.config as config
+from .grid_map import as_grid_map
+from .metrics import note_peak_open
+
+# Đoạn biên đi được ngắn hơn giá trị này chỉ đặt một cửa ở giữa, dài hơn thì đặt hai cửa ở hai đầu.
+SINGLE_ENTRANCE_MAX_RUN = 6
+
+
+class HierarchicalGraph:
+    """
+    Lớp trừu tượng HPA* dựng một lần từ GridMap.
+
+    Bản đồ được chia thành các cụm vuông `cluster_size` x `cluster_size`. Mỗi đoạn
+    biên đi được giữa hai cụm kề nhau sinh ra một hoặc hai "cửa"; các cửa trong cùng
+    một cụm được nối bằng cạnh có trọng số là khoảng cách BFS bên trong cụm. Truy vấn
+    chạy A* trên đồ thị cửa nhỏ này, rồi mới làm mịn thành đường từng ô khi cần.
+    """
+
+    def __init__(self, grid, cluster_size=config.HPA_CLUSTER_SIZE,
+                 segment_cache_size=config.HPA_SEGMENT_CACHE_MAX_ENTRIES):
+        self.grid = as_grid_map(grid)
+        self.cluster_size = cluster_size
+        self.cluster_rows = (self.grid.rows + cluster_size - 1) // cluster_size
+        self.cluster_cols = (self.grid.cols + cluster_size - 1) // cluster_size
+        self.cluster_nodes = {}
+        self.edges = {}
+        self.segment_cache_size = segment_cache_size
+        self._segment_cache = OrderedDict()
+        self._segment_lock = threading.Lock()
+        self._build_entrances()
+        self._build_intra_edges()
+
+    @property
+    def node_count(self):
+        return len(self.edges)
+
+    @property
+    def edge_count(self):
+        return sum(len(neighbors) for neighbors in self.edges.values()) // 2
+
+    def cluster_of(self, idx):
+        row, col = self.grid.coords(idx)
+        return (row // self.cluster_size) * self.cluster_cols + col // self.cluster_size
+
+    def _cluster_bounds(self, cluster_id):
+        cluster_r, cluster_c = divmod(cluster_id, self.cluster_cols)
+        row0, col0 = cluster_r * self.cluster_size, cluster_c * self.cluster_size
+        return (row0, min(row0 + self.cluster_size, self.grid.rows),
+                col0, min(col0 + self.cluster_size, self.grid.cols))
+
+    def _add_node(self, idx):
+        if idx not in self.edges:
+            self.edges[idx] = {}
+            self.cluster_nodes.setdefault(self.cluster_of(idx), []).append(idx)
+
+    def _add_entrance(self, run):
+        if not run:
+            return
+        if len(run) < SINGLE_ENTRANCE_MAX_RUN:
+            transitions = [run[len(run) // 2]]
+        else:
+            transitions = [run[0], run[-1]]
+        for a, b in transitions:
+            self._add_node(a)
+            self._add_node(b)
+            self.edges[a][b] = 1
+            self.edges[b][a] = 1
+
+    def _build_entrances(self):
+        grid, cells, size = self.grid, self.grid.cells, self.cluster_size
+
+        # Biên dọc giữa cột c - 1 và cột c.
+        for c in range(size, grid.cols, size):
+            for row0 in range(0, grid.rows, size):
+                run = []
+                for r in range(row0, min(row0 + size, grid.rows)):
+                    a = grid.index(r, c - 1)
+                    if cells[a] == 0 and cells[a + 1] == 0:
+                        run.append((a, a + 1))
+                    else:
+                        self._add_entrance(run)
+                        run = []
+                self._add_entrance(run)
+
+        # Biên ngang giữa hàng r - 1 và hàng r.
+        for r in range(size, grid.rows, size):
+            for col0 in range(0, grid.cols, size):
+                run = []
+                for c in range(col0, min(col0 + size, grid.cols)):
+                    a = grid.index(r - 1, c)
+                    if cells[a] == 0 and cells[a + grid.stride] == 0:
+                        run.append((a, a + grid.stride))
+                    else:
+                        self._add_entrance(run)
+                        run = []
+                self._add_entrance(run)
+
+    def _build_intra_edges(self):
+        with self.grid.workspace() as ws:
+            for cluster_id, nodes in self.cluster_nodes.items():
+                for node in nodes:
+                    distances = self._cluster_distances(node, cluster_id, nodes, ws)
+                    for other, distance in distances.items():
+                        if other != node:
+                            self.edges[node][other] = distance
+
+    def _cluster_bfs(self, source, cluster_id, ws):
+        """
+        BFS từ `source` nhưng không ra khỏi cụm, ghi khoảng cách và ô cha vào `ws.cost`
+        và `ws.parent`; trả về (thế hệ của ws, số ô đã tới).
+        """
+        row0, row1, col0, col1 = self._cluster_bounds(cluster_id)
+        cells, offsets, stride = self.grid.cells, self.grid.neighbor_offsets, self.grid.stride
+        gen = ws.begin()
+        stamp, distances, parents = ws.stamp, ws.cost, ws.parent
+        stamp[source] = gen
+        distances[source] = 0
+        parents[source] = -1
+        reached = 1
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            next_dist = distances[current] + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if cells[neighbor] or stamp[neighbor] == gen:
+                    continue
+                r, c = divmod(neighbor, stride)
+                if not (row0 <= r - 1 < row1 and col0 <= c - 1 < col1):
+                    continue
+                stamp[neighbor] = gen
+                distances[neighbor] = next_dist
+                parents[neighbor] = current
+                reached += 1
+                queue.append(neighbor)
+        return gen, reached
+
+    def _cluster_distances(self, source, cluster_id, targets, ws):
+        """Khoảng cách trong cụm từ `source` tới các ô `targets` tới được (dict nhỏ, chỉ gồm targets)."""
+        gen, _ = self._cluster_bfs(source, cluster_id, ws)
+        stamp, cost = ws.stamp, ws.cost
+        return {target: cost[target] for target in targets if stamp[target] == gen}
+
+    def _manhattan(self, a, b):
+        ar, ac = divmod(a, self.grid.stride)
+        br, bc = divmod(b, self.grid.stride)
+        return abs(ar - br) + abs(ac - bc)
+
+    def find_abstract_path(self, start, goal):
+        """
+        A* trên đồ thị cửa sau khi tạm chèn điểm đầu và điểm đích vào cụm của chúng.
+        Trả về (danh sách ô trừu tượng, số nút đã duyệt) — số nút gồm các ô BFS khi
+        chèn và các nút trừu tượng được mở rộng.
+        """
+        grid = self.grid
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
+        if start_idx == goal_idx:
+            return [start_idx], 1
+
+        start_cluster, goal_cluster = self.cluster_of(start_idx), self.cluster_of(goal_idx)
+        start_nodes = self.cluster_nodes.get(start_cluster, [])
+        goal_nodes = self.cluster_nodes.get(goal_cluster, [])
+        with self.grid.workspace() as ws:
+            gen, start_reached = self._cluster_bfs(start_idx, start_cluster, ws)
+            start_dist = {node: ws.cost[node] for node in start_nodes + [goal_idx] if ws.stamp[node] == gen}
+            gen, goal_reached = self._cluster_bfs(goal_idx, goal_cluster, ws)
+            goal_dist = {node: ws.cost[node] for node in goal_nodes if ws.stamp[node] == gen}
+        visited_cnt = start_reached + goal_reached
+
+        start_edges = dict(self.edges.get(start_idx, {}))
+        for node in start_nodes:
+            if node != start_idx and node in start_dist:
+                start_edges[node] = start_dist[node]
+        if start_cluster == goal_cluster and goal_idx in start_dist:
+            start_edges[goal_idx] = start_dist[goal_idx]
+        goal_edges = {node: goal_dist[node] for node in goal_nodes
+                      if node != goal_idx and node in goal_dist}
+
+        g_score = {start_idx: 0}
+        came_from = {start_idx: -1}
+        open_set = [(self._manhattan(start_idx, goal_idx), 0, start_idx)]
+        peak_open = 0
+        while open_set:
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+            _, current_g, current = heapq.heappop(open_set)
+            if current_g > g_score[current]:
+                continue
+            if current == goal_idx:
+                path = []
+                while current != -1:
+                    path.append(current)
+                    current = came_from[current]
+                path.reverse()
+                note_peak_open(peak_open)
+                return path, visited_cnt
+
+            visited_cnt += 1
+            neighbors = start_edges if current == start_idx else self.edges.get(current, {})
+            candidates = list(neighbors.items())
+            if current in goal_edges:
+                candidates.append((goal_idx, goal_edges[current]))
+            for neighbor, cost in candidates:
+                tentative_g_score = current_g + cost
+                if tentative_g_score < g_score.get(neighbor, float('inf')):
+                    g_score[neighbor] = tentative_g_score
+                    came_from[neighbor] = current
+                    heapq.heappush(open_set, (tentative_g_score + self._manhattan(neighbor, goal_idx),
+                                              tentative_g_score, neighbor))
+        note_peak_open(peak_open)
+        return [], visited_cnt
+
+    def _segment(self, a, b):
+        """
+        Các ô nằm sau `a` trên đoạn đường từ `a` tới `b`. Đoạn đã làm mịn được giữ trong cache
+        LRU `segment_cache_size` mục, vì các đoạn nối ô đầu/cuối của từng truy vấn làm khóa
+        mới liên tục.
+        """
+        key = (a, b)
+        with self._segment_lock:
+            segment = self._segment_cache.get(key)
+            if segment is not None:
+                self._segment_cache.move_to_end(key)
+                return segment
+        if b - a in self.grid.neighbor_offsets and self.cluster_of(a) != self.cluster_of(b):
+            segment = (b,)
+        else:
+            cells_on_path = []
+            with self.grid.workspace() as ws:
+                self._cluster_bfs(a, self.cluster_of(a), ws)
+                parents = ws.parent
+                temp = b
+                while temp != a:
+                    cells_on_path.append(temp)
+                    temp = parents[temp]
+            segment = tuple(reversed(cells_on_path))
+        if self.segment_cache_size > 0:
+            with self._segment_lock:
+                self._segment_cache[key] = segment
+                while len(self._segment_cache) > self.segment_cache_size:
+                    self._segment_cache.popitem(last=False)
+        return segment
+
+    def refine(self, abstract_path):
+        """Làm mịn dần đường trừu tượng thành các ô (r, c); chỉ tính đoạn nào thực sự được đọc tới."""
+        if not abstract_path:
+            return
+        coords = self.grid.coords
+        yield coords(abstract_path[0])
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            for idx in self._segment(a, b):
+                yield coords(idx)
+
+    def find_path(self, start, goal):
+        abstract_path, visited_cnt = self.find_abstract_path(start, goal)
+        return list(self.refine(abstract_path)), visited_cnt
+
+
+def hierarchical_graph_for(grid):
+    """Đồ thị HPA* của lưới, dựng một lần và dựng lại khi lưới thay đổi."""
+    grid = as_grid_map(grid)
+    return grid.derived('hpa', HierarchicalGraph)
@@ -0,0 +1,189 @@
+import heapq
+import threading
+
+from .grid_map import as_grid_map
+from .metrics import note_peak_open
+
+INCREMENTAL_ROUTE_NAME = "D* Lite"
+INCREMENTAL_ROUTE_INFO = ("Lập kế hoạch tăng dần: giữ cây tìm kiếm gốc tại điểm giao hàng, khi bạn di chuyển "
+                          "hoặc bản đồ đổi chỉ sửa phần bị ảnh hưởng. Báo giá lặp lại gần như miễn phí.")
+
+INF = float('inf')
+
+
+class DStarLite:
+    """
+    D* Lite (Koenig & Likhachev) trên GridMap 4 hướng, chi phí đồng nhất.
+
+    Tìm kiếm chạy ngược từ ô đích, nên `g[idx]` là số bước từ `idx` tới đích. Khi
+    ô bắt đầu đổi, chỉ cần cộng dồn `km` rồi tiếp tục; khi một số ô đổi trạng thái
+    đi được/vật cản, chỉ các ô đó và láng giềng được cập nhật lại. Mỗi lần gọi
+    `compute_shortest_path` chỉ mở rộng phần cây bị ảnh hưởng.
+    """
+
+    def __init__(self, grid, goal, start):
+        self.grid = as_grid_map(grid)
+        self.goal = tuple(goal)
+        self.goal_idx = self.grid.index(*goal)
+        self.start_idx = self.grid.index(*start)
+        self.last_idx = self.start_idx
+        self.version = self.grid.version
+        self.km = 0
+        self.g = [INF] * self.grid.size
+        self.rhs = [INF] * self.grid.size
+        self.open_keys = {}
+        self.open_heap = []
+        self.peak_open = 0
+        self.rhs[self.goal_idx] = 0
+        self._push(self.goal_idx)
+
+    def _heuristic(self, idx):
+        stride = self.grid.stride
+        r, c = divmod(idx, stride)
+        start_r, start_c = divmod(self.start_idx, stride)
+        return abs(r - start_r) + abs(c - start_c)
+
+    def _key(self, idx):
+        best = min(self.g[idx], self.rhs[idx])
+        return (best + self._heuristic(idx) + self.km, best)
+
+    def _push(self, idx):
+        key = self._key(idx)
+        self.open_keys[idx] = key
+        heapq.heappush(self.open_heap, (key, idx))
+
+    def _update_vertex(self, idx):
+        cells, g = self.grid.cells, self.g
+        if idx != self.goal_idx:
+            best = INF
+            if cells[idx] == 0:
+                for offset in self.grid.neighbor_offsets:
+                    neighbor = idx + offset
+                    if cells[neighbor] == 0 and g[neighbor] + 1 < best:
+                        best = g[neighbor] + 1
+            self.rhs[idx] = best
+        if self.g[idx] != self.rhs[idx]:
+            self._push(idx)
+        else:
+            self.open_keys.pop(idx, None)
+
+    def _top_key(self):
+        heap, open_keys = self.open_heap, self.open_keys
+        while heap:
+            key, idx = heap[0]
+            if open_keys.get(idx) == key:
+                return key
+            heapq.heappop(heap)
+        return (INF, INF)
+
+    def move_start(self, start):
+        """Ô bắt đầu mới (người chơi đã đi chỗ khác); không cần mở rộng lại gì ngay."""
+        new_idx = self.grid.index(*start)
+        if new_idx == self.start_idx:
+            return
+        self.start_idx = new_idx
+        self.km += self._heuristic(self.last_idx)
+        self.last_idx = new_idx
+
+    def apply_changes(self, changed_cells):
+        """Cập nhật các ô vừa đổi trạng thái cùng láng giềng của chúng."""
+        offsets = self.grid.neighbor_offsets
+        for idx in changed_cells:
+            if self.grid.cells[idx] != 0:
+                self.g[idx] = INF
+            self._update_vertex(idx)
+            for offset in offsets:
+                self._update_vertex(idx + offset)
+        self.version = self.grid.version
+
+    def compute_shortest_path(self):
+        """
+        Sửa cây tìm kiếm tới khi khoảng cách của ô bắt đầu đúng; trả về số ô đã mở rộng.
+        `peak_open` ghi số ô lớn nhất trong tập mở trong lần gọi này.
+        """
+        g, rhs, offsets = self.g, self.rhs, self.grid.neighbor_offsets
+        open_keys = self.open_keys
+        start = self.start_idx
+        expanded = 0
+        self.peak_open = len(open_keys)
+        while True:
+            if len(open_keys) > self.peak_open:
+                self.peak_open = len(open_keys)
+            top_key = self._top_key()
+            if top_key == (INF, INF):
+                break
+            if not (top_key < self._key(start) or rhs[start] != g[start]):
+                break
+            _, u = heapq.heappop(self.open_heap)
+            new_key = self._key(u)
+            if top_key < new_key:
+                self._push(u)
+                continue
+            del open_keys[u]
+            expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+                for offset in offsets:
+                    self._update_vertex(u + offset)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for offset in offsets:
+                    self._update_vertex(u + offset)
+        return expanded
+
+    def path(self):
+        """Đường ngắn nhất hiện tại từ ô bắt đầu tới đích, đi theo láng giềng có g nhỏ nhất."""
+        grid, g = self.grid, self.g
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        current = self.start_idx
+        if cells[current] != 0 or g[current] == INF:
+            return []
+        path = [grid.coords(current)]
+        while current != self.goal_idx:
+            best, best_cost = -1, INF
+            for offset in offsets:
+                neighbor = current + offset
+                if cells[neighbor] == 0 and g[neighbor] < best_cost:
+                    best, best_cost = neighbor, g[neighbor]
+            if best == -1 or best_cost >= g[current]:
+                return []
+            current = best
+            path.append(grid.coords(current))
+        return path
+
+
+class IncrementalPlanner:
+    """
+    Giữ một DStarLite cho điểm giao hàng hiện tại để PathFinder dùng như một gói cước.
+    Đổi điểm đích thì dựng lại; cùng điểm đích thì chỉ dời ô bắt đầu và áp các ô đã đổi.
+    """
+
+    def __init__(self, grid):
+        self.grid = as_grid_map(grid)
+        self.planner = None
+        self._lock = threading.Lock()
+
+    def _planner_for(self, start, goal):
+        planner = self.planner
+        if planner is None or planner.goal != tuple(goal):
+            self.planner = DStarLite(self.grid, goal, start)
+            return self.planner
+        changes = self.grid.changes_since(planner.version)
+        if changes is None:
+            self.planner = DStarLite(self.grid, goal, start)
+            return self.planner
+        planner.move_start(start)
+        if changes:
+            planner.apply_changes(changes)
+        return planner
+
+    def route(self, grid, start, goal):
+        """Cùng hợp đồng `(path, visited_count)` với ALGORITHM_MAP; số ô duyệt chỉ tính phần phải sửa."""
+        if not (self.grid.is_walkable(*start) and self.grid.is_walkable(*goal)):
+            return [], 0
+        with self._lock:
+            planner = self._planner_for(start, goal)
+            expanded = planner.compute_shortest_path()
+            note_peak_open(planner.peak_open)
+            return planner.path(), expanded
@@ -0,0 +1,80 @@
+from array import array
+from collections import deque
+
+import src.config as config
+from .components import component_labels_for
+from .grid_map import as_grid_map
+
+
+def _bfs_distances(grid, source):
+    """Khoảng cách BFS từ `source` tới mọi ô (theo chỉ số có viền); -1 nếu không tới được."""
+    cells, offsets = grid.cells, grid.neighbor_offsets
+    distance = array('i', [-1]) * grid.size
+    distance[source] = 0
+    queue = deque([source])
+    while queue:
+        current = queue.popleft()
+        next_dist = distance[current] + 1
+        for offset in offsets:
+            neighbor = current + offset
+            if cells[neighbor] == 0 and distance[neighbor] == -1:
+                distance[neighbor] = next_dist
+                queue.append(neighbor)
+    return distance
+
+
+class LandmarkHeuristic:
+    """
+    Heuristic ALT (A*, Landmarks, Triangle inequality).
+
+    Khi nạp bản đồ, chọn K ô mốc trong vùng liên thông lớn nhất theo kiểu "xa nhất
+    trước" và tính sẵn khoảng cách BFS từ mỗi mốc. Với mọi mốc L, bất đẳng thức tam
+    giác cho |d(L, n) - d(L, đích)| <= d(n, đích); lấy max qua các mốc (và khoảng cách
+    Manhattan) được một cận dưới nhất quán, sát hơn nhiều so với khoảng cách Euclid
+    khi đường phải vòng qua tường.
+    """
+
+    def __init__(self, grid, landmark_count=config.ALT_LANDMARK_COUNT):
+        self.grid = as_grid_map(grid)
+        self.landmarks = []
+        self.distances = []
+        self._select_landmarks(landmark_count)
+
+    def _select_landmarks(self, landmark_count):
+        seed = component_labels_for(self.grid).largest_component_cell()
+        if seed < 0 or landmark_count <= 0:
+            return
+        seed_distance = _bfs_distances(self.grid, seed)
+        nearest = list(seed_distance)
+        for _ in range(landmark_count):
+            landmark = max(range(len(nearest)), key=nearest.__getitem__)
+            if nearest[landmark] <= 0 and self.landmarks:
+                break
+            distance = _bfs_distances(self.grid, landmark)
+            self.landmarks.append(landmark)
+            self.distances.append(distance)
+            nearest = [min(a, b) for a, b in zip(nearest, distance)]
+
+    def estimator(self, goal_idx):
+        """Hàm h(idx) ước lượng số bước từ ô `idx` tới `goal_idx`."""
+        stride = self.grid.stride
+        goal_r, goal_c = divmod(goal_idx, stride)
+        pairs = [(distance, distance[goal_idx]) for distance in self.distances]
+
+        def estimate(idx):
+            r, c = divmod(idx, stride)
+            best = abs(r - goal_r) + abs(c - goal_c)
+            for distance, goal_distance in pairs:
+                bound = distance[idx] - goal_distance
+                if bound < 0:
+                    bound = -bound
+                if bound > best:
+                    best = bound
+            return best
+        return estimate
+
+
+def landmark_heuristic_for(grid):
+    """Heuristic ALT của lưới, dựng một lần và dựng lại khi lưới thay đổi."""
+    grid = as_grid_map(grid)
+    return grid.derived('alt', LandmarkHeuristic)
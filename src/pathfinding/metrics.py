@@ -0,0 +1,110 @@
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+
+_search_stats = threading.local()
+
+
+def note_peak_open(size):
+    """Thuật toán ghi kích thước lớn nhất của tập mở trước khi trả kết quả (theo từng luồng)."""
+    _search_stats.peak_open = size
+
+
+def take_peak_open():
+    """Lấy và xóa giá trị `note_peak_open` gần nhất của luồng hiện tại; None nếu thuật toán không ghi."""
+    value = getattr(_search_stats, 'peak_open', None)
+    _search_stats.peak_open = None
+    return value
+
+
+class SearchMetrics:
+    """
+    Sổ đo của mọi lượt tìm đường đi qua PathFinder.
+
+    Mỗi bản ghi là một dict cùng các khóa trong `FIELDS`; chỉ giữ `capacity` bản ghi
+    gần nhất trong một bộ đệm vòng, nên có thể bật suốt phiên chơi. Ghi được từ luồng
+    phụ (pool tính giá) nhờ một khóa. Các lượt tính giá trước chạy nền được đánh dấu
+    `speculative` và không tính vào thống kê của `summary`.
+    """
+
+    FIELDS = ('timestamp', 'algorithm', 'start', 'goal', 'wall_ms', 'expanded', 'peak_open',
+              'path_length', 'cache_hit', 'speculative')
+
+    def __init__(self, capacity):
+        self.records = deque(maxlen=capacity)
+        self.total_count = 0
+        self.speculative_count = 0
+        self._lock = threading.Lock()
+
+    def record(self, algorithm, start, goal, wall_ms, expanded, peak_open, path_length, cache_hit=False,
+               speculative=False):
+        entry = {
+            'timestamp': time.time(),
+            'algorithm': algorithm,
+            'start': tuple(start) if start is not None else None,
+            'goal': tuple(goal) if goal is not None else None,
+            'wall_ms': wall_ms,
+            'expanded': expanded,
+            'peak_open': peak_open,
+            'path_length': path_length,
+            'cache_hit': cache_hit,
+            'speculative': speculative,
+        }
+        with self._lock:
+            self.records.append(entry)
+            if speculative:
+                self.speculative_count += 1
+            else:
+                self.total_count += 1
+        return entry
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.records)
+
+    def summary(self):
+        """
+        Thống kê theo thuật toán trên các bản ghi còn trong bộ đệm, sắp theo tên thuật toán.
+        Lượt tính trước chỉ được đếm ở cột `speculative`.
+        """
+        groups, speculative = {}, {}
+        for entry in self.snapshot():
+            if entry['speculative']:
+                speculative[entry['algorithm']] = speculative.get(entry['algorithm'], 0) + 1
+                groups.setdefault(entry['algorithm'], [])
+            else:
+                groups.setdefault(entry['algorithm'], []).append(entry)
+        rows = []
+        for algorithm in sorted(groups):
+            entries = groups[algorithm]
+            searched = [entry for entry in entries if not entry['cache_hit']]
+            peaks = [entry['peak_open'] for entry in searched if entry['peak_open'] is not None]
+            rows.append({
+                'algorithm': algorithm,
+                'queries': len(entries),
+                'cache_hits': len(entries) - len(searched),
+                'mean_ms': sum(entry['wall_ms'] for entry in searched) / len(searched) if searched else 0.0,
+                'mean_expanded': sum(entry['expanded'] for entry in searched) / len(searched) if searched else 0.0,
+                'max_peak_open': max(peaks) if peaks else None,
+                'speculative': speculative.get(algorithm, 0),
+            })
+        return rows
+
+    def dump(self, path):
+        """Ghi các bản ghi ra file CSV, hoặc JSON nếu `path` có đuôi .json."""
+        records = self.snapshot()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if path.lower().endswith('.json'):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'records': records, 'summary': self.summary()}, f, ensure_ascii=False, indent=2)
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+                writer.writeheader()
+                writer.writerows(records)
+        return len(records)
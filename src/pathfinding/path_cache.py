@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+
+
+class PathCache:
+    """
+    Bộ nhớ đệm LRU có giới hạn cho kết quả `(path_nodes, visited_count)`.
+
+    Khóa gồm tên thuật toán, ô bắt đầu, ô đích và `version` của lưới, nên mọi
+    thay đổi trên lưới tự động làm các kết quả cũ không còn được dùng tới.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(algo_name, start, goal, grid_version):
+        return (algo_name, tuple(start), tuple(goal), grid_version)
+
+    def get(self, key):
+        """Trả về `(path_nodes, visited_count)` hoặc None nếu chưa có trong cache."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        path_nodes, visited_count = entry
+        return list(path_nodes), visited_count
+
+    def __contains__(self, key):
+        """Kiểm tra có khóa hay không mà không tính vào hits/misses và không đổi thứ tự LRU."""
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, path_nodes, visited_count):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (tuple(path_nodes), visited_count)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
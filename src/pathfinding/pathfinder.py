@@ -1,16 +1,32 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pygame
 import pygame_gui
 from pygame_gui.elements import UIButton, UILabel
 import src.config as config
+from src.core.action_plan import ActionPlan
+
+from .path_cache import PathCache
+from .hierarchical import hierarchical_graph_for
+from .landmarks import landmark_heuristic_for
+from .components import component_labels_for
+from .distance_field import DistanceFieldSet, PRECOMPUTED_ROUTE_NAME, PRECOMPUTED_ROUTE_INFO
+from .incremental import IncrementalPlanner, INCREMENTAL_ROUTE_NAME, INCREMENTAL_ROUTE_INFO
+from .search_task import SearchTask
+from .metrics import SearchMetrics, take_peak_open
+from .pathfinding_algorithms import ALGORITHM_MAP, ALGORITHM_STEP_MAP, ALGORITHM_INFO, PathfindingAlgorithms, algorithm_kwargs
+
+MULTI_POINT_QUOTE_NAME = "BFS (mọi điểm)"
 
-from .pathfinding_algorithms import ALGORITHM_MAP, ALGORITHM_INFO
 
 class PathFinder:
-    def __init__(self, floor_block_data, ui_manager, player, point_manager):
-        self.tile_size = config.TILE_SIZE
-        self.grid = self._create_grid(floor_block_data)
-        self.rows = len(self.grid)
-        self.cols = len(self.grid[0]) if self.rows > 0 else 0
+    def __init__(self, world_map, ui_manager, player, point_manager):
+        self.world_map = world_map
+        self.tile_size = world_map.tile_size
+        self.grid = world_map.grid
+        self.rows = self.grid.rows
+        self.cols = self.grid.cols
         
         self.ui_manager = ui_manager
         self.player = player
@@ -21,47 +37,192 @@ class PathFinder:
         
         self.input_active = False
         
-        self.algorithms = list(ALGORITHM_MAP.keys())
+        self.path_cache = PathCache(config.PATH_CACHE_MAX_ENTRIES)
+        self.metrics = SearchMetrics(config.PATHFINDING_METRICS_SIZE)
+        self.show_metrics = False
+        self._metrics_font = None
+        self.algorithm_funcs = dict(ALGORITHM_MAP)
+        self.algorithm_info = dict(ALGORITHM_INFO)
+        # Mỗi gói cước chia nhỏ được giữ một workspace khi đang chạy; hai gói hai chiều giữ hai.
+        self.grid.reserve_workspaces(len(ALGORITHM_STEP_MAP) + 2)
+        hierarchical_graph_for(self.grid)
+        component_labels_for(self.grid)
+        if config.ALT_HEURISTIC_ENABLED:
+            landmark_heuristic_for(self.grid)
+        self.distance_fields = DistanceFieldSet(self.grid)
+        self._build_distance_fields()
+        if self.distance_fields.fields:
+            self.algorithm_funcs[PRECOMPUTED_ROUTE_NAME] = self.distance_fields.route
+            self.algorithm_info[PRECOMPUTED_ROUTE_NAME] = PRECOMPUTED_ROUTE_INFO
+        self.incremental_planner = IncrementalPlanner(self.grid)
+        if config.INCREMENTAL_PLANNER_ENABLED:
+            self.algorithm_funcs[INCREMENTAL_ROUTE_NAME] = self.incremental_planner.route
+            self.algorithm_info[INCREMENTAL_ROUTE_NAME] = INCREMENTAL_ROUTE_INFO
+
+        self.algorithms = list(self.algorithm_funcs.keys())
         self.algorithm_details = {} 
+        self._quote_executor = None
+        self._pending_quotes = {}
+        self._quote_start = None
+        self._quote_goal = None
+        self._speculative_quotes = {}
+        self._speculative_key = None
+        self._speculative_goal = None
+        self._speculative_tile = None
+        self._speculative_settle_frames = 0
+        # Thời gian (ms) lần tính trước gần nhất của từng gói cước, kể cả lượt bị hủy giữa chừng.
+        self._speculative_cost_ms = {}
 
         self.algorithm_buttons = []
         self.info_label = None
         self.cancel_button = None
         self.error_label = None
         self.title_label = None
-
-    def _create_grid(self, floor_block_data):
-        grid = []
-        for r_idx, row_data_val in enumerate(floor_block_data):
-            grid_row = []
-            for c_idx, value_val in enumerate(row_data_val):
-                val_str = value_val.strip()
-                is_blocked = val_str != '-1' and val_str != ''
-                grid_row.append(1 if is_blocked else 0)
-            grid.append(grid_row)
-        return grid
+        self.attach_point_manager(point_manager)
+
+    def attach_point_manager(self, point_manager):
+        """Theo dõi sự kiện sinh điểm giao hàng mới để tính trước giá taxi."""
+        if point_manager is not self.point_manager:
+            self.point_manager.remove_spawn_listener(self._on_point_spawned)
+            self.point_manager = point_manager
+        point_manager.add_spawn_listener(self._on_point_spawned)
+        self._on_point_spawned(point_manager.current_point_center if point_manager.is_visible else None)
+
+    def _on_point_spawned(self, point_center):
+        self._speculative_goal = self.pixel_to_grid(*point_center) if point_center else None
+        self._cancel_speculative_quotes()
+        if config.TAXI_SPECULATIVE_QUOTES and not self.input_active:
+            self._refresh_speculative_quotes(all_tiers=True)
+
+    def _cancel_speculative_quotes(self):
+        for index, job in self._speculative_quotes.items():
+            if job.cancel():
+                algo_name = self.algorithms[index]
+                self._speculative_cost_ms[algo_name] = max(job.elapsed_ms, self._speculative_cost_ms.get(algo_name, 0.0))
+        self._speculative_quotes.clear()
+        self._speculative_key = None
+
+    def _refresh_speculative_quotes(self, all_tiers=False):
+        """
+        Tính trước giá các gói cước từ ô hiện tại của người chơi tới điểm giao hàng, ở chế độ
+        nền (cùng bộ lập lịch với cửa sổ báo giá); kết quả nằm trong PathCache nên cửa sổ taxi
+        mở ra đã có sẵn giá.
+
+        Khi có điểm giao hàng mới (`all_tiers=True`) mọi gói cước được tính ngay. Khi người chơi
+        đổi ô, các lượt cũ bị hủy và chỉ tính lại sau khi người chơi đứng yên
+        TAXI_SPECULATIVE_SETTLE_FRAMES khung hình, và chỉ cho các gói cước có lần chạy gần nhất
+        không quá TAXI_SPECULATIVE_MOVE_MAX_MS; các gói còn lại được tính khi mở cửa sổ taxi.
+        """
+        goal = self._speculative_goal
+        if goal is None or self.player.actions:
+            if self._speculative_quotes: self._cancel_speculative_quotes()
+            self._speculative_tile = None
+            return
+        start = self.pixel_to_grid(*self.player.rect.center)
+        if start != self._speculative_tile:
+            self._speculative_tile = start
+            self._speculative_settle_frames = 0
+        elif self._speculative_settle_frames < config.TAXI_SPECULATIVE_SETTLE_FRAMES:
+            self._speculative_settle_frames += 1
+        key = (start, goal, self.grid.version)
+        if key == self._speculative_key:
+            return
+        if self._speculative_quotes and self._speculative_key[0] != start:
+            self._cancel_speculative_quotes()
+        if not all_tiers and self._speculative_settle_frames < config.TAXI_SPECULATIVE_SETTLE_FRAMES:
+            return
+        self._cancel_speculative_quotes()
+        self._speculative_key = key
+        if not (self._is_valid_position(*start) and self._is_valid_position(*goal)) or \
+           not self._is_reachable(start, goal):
+            return
+        for i, algo_name in enumerate(self.algorithms):
+            if not callable(self.algorithm_funcs.get(algo_name)):
+                continue
+            if not all_tiers and self._speculative_cost_ms.get(algo_name, 0.0) > config.TAXI_SPECULATIVE_MOVE_MAX_MS:
+                continue
+            if PathCache.make_key(algo_name, start, goal, self.grid.version) not in self.path_cache:
+                self._speculative_quotes[i] = self._submit_quote(algo_name, start, goal, speculative=True)
 
     def _is_valid_position(self, row, col):
-        return 0 <= row < self.rows and 0 <= col < self.cols and self.grid[row][col] == 0
+        return self.grid.is_walkable(row, col)
+
+    def _build_distance_fields(self):
+        """
+        Tính sẵn bản đồ khoảng cách tới mọi điểm giao hàng. Nếu được bật, nạp lại từ file trước
+        rồi chỉ tính thêm các điểm mà file chưa có (ví dụ khi CSV thực thể đổi điểm xuất hiện).
+        """
+        targets = []
+        for center in self.point_manager.spawn_points_pixels:
+            target = self.pixel_to_grid(*center)
+            if self._is_valid_position(*target):
+                targets.append(target)
+        if config.DISTANCE_FIELD_PERSIST:
+            self.distance_fields.load(config.DISTANCE_FIELD_CACHE_PATH)
+        missing = [target for target in targets if not self.distance_fields.has(target)]
+        self.distance_fields.build(missing)
+        if config.DISTANCE_FIELD_PERSIST and missing:
+            try:
+                self.distance_fields.save(config.DISTANCE_FIELD_CACHE_PATH)
+            except OSError as e:
+                print(f"Cảnh báo: Không ghi được file bản đồ khoảng cách: {e}")
+
+    def _is_reachable(self, start, goal):
+        """Kiểm tra O(1) bằng nhãn vùng liên thông: hai ô có nằm cùng một vùng đi được không."""
+        return component_labels_for(self.grid).connected(start, goal)
+
+    def _algorithm_kwargs(self, algo_name):
+        return algorithm_kwargs(algo_name, self.grid)
+
+    def _create_search_task(self, algo_name, start, goal, speculative=False):
+        """SearchTask cho một thuật toán: chia nhỏ được nếu có generator `*_steps`, nếu không thì một bước."""
+        kwargs = self._algorithm_kwargs(algo_name)
+        steps_func = ALGORITHM_STEP_MAP.get(algo_name)
+        if steps_func is not None:
+            return SearchTask(steps_func(self.grid, start, goal, **kwargs), speculative)
+        return SearchTask.from_callable(self.algorithm_funcs[algo_name], self.grid, start, goal,
+                                        speculative=speculative, **kwargs)
+
+    def _submit_quote(self, algo_name, start, goal, speculative=False):
+        """
+        Gửi một lượt tính giá cho bộ lập lịch. Các gói cước không chia nhỏ được (HPA*, tuyến
+        định sẵn, D* Lite: không có generator `*_steps`) luôn chạy trên pool luồng để không
+        chiếm trọn một khung hình. `speculative` đánh dấu lượt tính trước để sổ đo ghi riêng.
+        """
+        task = self._create_search_task(algo_name, start, goal, speculative)
+        if config.TAXI_QUOTE_SCHEDULER == "threads" or algo_name not in ALGORITHM_STEP_MAP:
+            task.submit_to(self._get_quote_executor())
+        return task
+
+    def _run_algorithm(self, algo_name, start, goal):
+        cached = self.path_cache.get(PathCache.make_key(algo_name, start, goal, self.grid.version))
+        if cached is not None:
+            self._record_cache_hit(algo_name, start, goal, cached)
+            return cached
+        return self._compute_algorithm(algo_name, start, goal)
+
+    def _compute_algorithm(self, algo_name, start, goal):
+        """Chạy thuật toán ngay và ghi kết quả vào cache."""
+        cache_key = PathCache.make_key(algo_name, start, goal, self.grid.version)
+        algorithm_func = self.algorithm_funcs.get(algo_name)
+        take_peak_open()
+        started = time.perf_counter()
+        path_nodes, visited_count = algorithm_func(self.grid, start, goal, **self._algorithm_kwargs(algo_name))
+        wall_ms = (time.perf_counter() - started) * 1000
+        self.metrics.record(algo_name, start, goal, wall_ms, visited_count, take_peak_open(), len(path_nodes))
+        self.path_cache.put(cache_key, path_nodes, visited_count)
+        return path_nodes, visited_count
+
+    def _record_cache_hit(self, algo_name, start, goal, cached):
+        path_nodes, visited_count = cached
+        self.metrics.record(algo_name, start, goal, 0.0, visited_count, None, len(path_nodes), cache_hit=True)
 
     def _path_to_actions(self, path_nodes):
-        actions = []
-        if not path_nodes or len(path_nodes) < 2:
-            return []
-        for i in range(len(path_nodes) - 1):
-            current_node = path_nodes[i]
-            next_node = path_nodes[i+1]
-            dr, dc = next_node[0] - current_node[0], next_node[1] - current_node[1]
-            if dr == -1: actions.append('W')
-            elif dr == 1: actions.append('S')
-            elif dc == -1: actions.append('A')
-            elif dc == 1: actions.append('D')
-        return actions
+        """Lộ trình đoạn thẳng `(hướng, số_ô)` cho Player, thay vì một ký tự cho mỗi ô."""
+        return ActionPlan.from_path(path_nodes)
 
     def pixel_to_grid(self, x, y):
-        row = y // self.tile_size
-        col = x // self.tile_size
-        return int(row), int(col)
+        return self.world_map.pixel_to_tile(x, y)
 
     def calculate_taxi_fare(self, path_length, visited_count):
         if path_length <= 0: 
@@ -80,6 +241,61 @@ class PathFinder:
              
         return int(round(price)) 
 
+    def _get_quote_executor(self):
+        if self._quote_executor is None:
+            self._quote_executor = ThreadPoolExecutor(max_workers=config.TAXI_QUOTE_WORKERS,
+                                                      thread_name_prefix="taxi-quote")
+        return self._quote_executor
+
+    def _apply_quote_result(self, index, algo_name, path_nodes=None, visited_count=0, error_text=None):
+        """Cập nhật chi tiết giá và nút tương ứng khi một thuật toán tính xong."""
+        details = {'price': float('inf'), 'length': 0, 'visited': visited_count, 'path_nodes': []}
+        is_button_enabled = False
+        if error_text:
+            display_text_suffix = error_text
+        elif path_nodes:
+            path_length = len(path_nodes)
+            taxi_price = self.calculate_taxi_fare(path_length, visited_count)
+            details.update(price=taxi_price, length=path_length, path_nodes=path_nodes)
+            num_moves = path_length - 1 if path_length > 0 else 0
+            display_text_suffix = f"Giá: {taxi_price} (Dài: {num_moves}, Duyệt: {visited_count} ô)"
+            is_button_enabled = True
+        else:
+            display_text_suffix = f"Không tìm thấy đường (Duyệt: {visited_count} ô)"
+
+        self.algorithm_details[algo_name] = details
+        if index < len(self.algorithm_buttons):
+            button = self.algorithm_buttons[index]
+            button.set_text(f"{algo_name} | {display_text_suffix}")
+            if is_button_enabled:
+                button.enable()
+            else:
+                button.disable()
+
+    def _layout_algorithm_buttons(self, count, start_y, button_width):
+        """Xếp các nút gói cước thành 1 cột, hoặc 2 cột khi không đủ chỗ, chừa chỗ cho nhãn thông tin."""
+        spacing = 10
+        bottom_y = self.screen_height - 130
+        button_height = min(50, (bottom_y - start_y) // (count + 1) - spacing)
+        columns = 1
+        if button_height < 36:
+            columns = 2
+            button_width = (self.screen_width - 3 * spacing) // 2
+            rows = (count + 1) // 2
+            button_height = min(50, (bottom_y - start_y) // (rows + 1) - spacing)
+
+        rects = []
+        left_x = (self.screen_width - (button_width * columns + spacing * (columns - 1))) // 2
+        for i in range(count):
+            row, col = divmod(i, columns)
+            rects.append(pygame.Rect(left_x + col * (button_width + spacing), start_y + row * (button_height + spacing),
+                                     button_width, button_height))
+        rows_used = (count + columns - 1) // columns
+        cancel_width = min(button_width, 420)
+        cancel_rect = pygame.Rect((self.screen_width - cancel_width) // 2, start_y + rows_used * (button_height + spacing),
+                                  cancel_width, button_height)
+        return rects, cancel_rect
+
     def enable_input(self):
         if self.input_active: return
         if not self.point_manager.is_visible or not self.point_manager.current_point_center:
@@ -97,7 +313,6 @@ class PathFinder:
         )
         button_width = 420 
         button_height = 50
-        button_spacing = 10 
         start_y = self.title_label.relative_rect.bottom + 20
         start_pos_pixels = self.player.rect.center
         goal_pos_pixels = self.point_manager.current_point_center
@@ -122,60 +337,37 @@ class PathFinder:
             self.cancel_button = UIButton(relative_rect=cancel_button_rect, text="Đóng", manager=self.ui_manager, object_id="#pathfinder_cancel_button")
             return
 
+        button_rects, cancel_button_rect = self._layout_algorithm_buttons(len(self.algorithms), start_y, button_width)
 
+        start, goal = (start_row, start_col), (goal_row, goal_col)
+        self._quote_start, self._quote_goal = start, goal
+        reachable = self._is_reachable(start, goal)
         for i, algo_name in enumerate(self.algorithms):
-            algorithm_func = ALGORITHM_MAP.get(algo_name)
-            path_nodes, visited_count = [], 0
-            display_text_suffix = "Đang xử lý..."
-            is_button_enabled = False
-            exception_that_occurred_name = None
-            current_algo_details = {'price': float('inf'), 'length': 0, 'visited': 0, 'path_nodes': []}
-
-            if callable(algorithm_func):
-                try:
-                    if algo_name == "Backtracking": 
-                         path_nodes, visited_count = algorithm_func(self.grid, (start_row, start_col), (goal_row, goal_col), 
-                                                                    max_depth_factor=config.BACKTRACKING_MAX_DEPTH_FACTOR,
-                                                                    max_calls_factor=config.BACKTRACKING_MAX_CALLS_FACTOR)
-                    elif algo_name == "BEAM_SEARCH":
-                         path_nodes, visited_count = algorithm_func(self.grid, (start_row, start_col), (goal_row, goal_col), 
-                                                                    beam_width=config.BEAM_SEARCH_WIDTH_DEFAULT)
-                    else: 
-                        path_nodes, visited_count = algorithm_func(self.grid, (start_row, start_col), (goal_row, goal_col))
-                    
-                    if display_text_suffix == "Đang xử lý...":
-                        if not path_nodes:
-                            display_text_suffix = f"Không tìm thấy đường (Duyệt: {visited_count} ô)"
-                except Exception as e_details: 
-                    print(f"Lỗi khi chạy thử thuật toán {algo_name}: {e_details}")
-                    exception_that_occurred_name = type(e_details).__name__ 
-                    display_text_suffix = f"Lỗi: {exception_that_occurred_name}"
-                
-                current_algo_details['visited'] = visited_count
-                if path_nodes: 
-                    path_length = len(path_nodes)
-                    current_algo_details['length'] = path_length
-                    current_algo_details['path_nodes'] = path_nodes 
-                    
-                    taxi_price = self.calculate_taxi_fare(path_length, visited_count)
-                    current_algo_details['price'] = taxi_price
-                    
-                    num_moves = path_length - 1 if path_length > 0 else 0
-                    display_text_suffix = f"Giá: {taxi_price} (Dài: {num_moves}, Duyệt: {visited_count} ô)"
-                    is_button_enabled = True
-            else: 
-                display_text_suffix = "Lỗi cấu hình hàm"
-            
-            self.algorithm_details[algo_name] = current_algo_details
-            button_text = f"{algo_name} | {display_text_suffix}"
-            button_rect = pygame.Rect((self.screen_width - button_width) // 2, start_y + i * (button_height + button_spacing), button_width, button_height)
-            button = UIButton(relative_rect=button_rect, text=button_text, manager=self.ui_manager, object_id=f"#algo_button_{i}")
-            if not is_button_enabled:
-                button.disable()
+            button = UIButton(relative_rect=button_rects[i], text=f"{algo_name} | Đang tính giá...",
+                              manager=self.ui_manager, object_id=f"#algo_button_{i}")
+            button.disable()
             self.algorithm_buttons.append(button)
 
-        cancel_button_y = start_y + len(self.algorithms) * (button_height + button_spacing)
-        cancel_button_rect = pygame.Rect((self.screen_width - button_width) // 2, cancel_button_y, button_width, button_height)
+            if not callable(self.algorithm_funcs.get(algo_name)):
+                self._apply_quote_result(i, algo_name, error_text="Lỗi cấu hình hàm")
+                continue
+            if not reachable:
+                self._apply_quote_result(i, algo_name, [], 0)
+                continue
+            cache_key = PathCache.make_key(algo_name, start, goal, self.grid.version)
+            if cache_key in self.path_cache:
+                cached = self.path_cache.get(cache_key)
+                self._record_cache_hit(algo_name, start, goal, cached)
+                self._apply_quote_result(i, algo_name, *cached)
+            elif i in self._speculative_quotes and self._speculative_key == (start, goal, self.grid.version):
+                task = self._speculative_quotes.pop(i)
+                # Từ giờ task trả lời một lượt báo giá thật, nên được ghi sổ đo như lượt thường.
+                task.speculative = False
+                self._pending_quotes[i] = task
+            else:
+                self._pending_quotes[i] = self._submit_quote(algo_name, start, goal)
+        self._cancel_speculative_quotes()
+
         self.cancel_button = UIButton(relative_rect=cancel_button_rect, text="Hủy", manager=self.ui_manager, object_id="#pathfinder_cancel_button")
 
         info_label_y = cancel_button_rect.bottom + 15
@@ -192,6 +384,8 @@ class PathFinder:
 
     def disable_input(self):
         self.input_active = False
+        for task in self._pending_quotes.values(): task.cancel()
+        self._pending_quotes.clear()
         for button in self.algorithm_buttons: button.kill()
         self.algorithm_buttons = []
         if self.title_label: self.title_label.kill(); self.title_label = None
@@ -211,7 +405,7 @@ class PathFinder:
                         hovered_a_button = True
                         algo_name = self.algorithms[i]
                         details = self.algorithm_details.get(algo_name)
-                        base_info = ALGORITHM_INFO.get(algo_name, "Không có thông tin.")
+                        base_info = self.algorithm_info.get(algo_name, "Không có thông tin.")
                         if details:
                             price = details['price']
                             length = details['length']
@@ -250,14 +444,66 @@ class PathFinder:
                     if not self.player.spend_money(cost):
                         if self.error_label: self.error_label.set_text(f"Không đủ tiền! Cần: {cost}, Bạn có: {self.player.money}")
                         return
-                    actions = self._path_to_actions(path_nodes_to_use)
-                    self.player.set_actions(actions, path_nodes_to_use) 
+                    self.player.set_actions(self._path_to_actions(path_nodes_to_use))
                     self.disable_input()
                     return
 
+    def quote_all_points(self, player_pos_pixels=None):
+        """
+        Báo giá tới mọi điểm giao hàng trong `PointManager.spawn_points_pixels` bằng một
+        lượt BFS duy nhất từ ô của người chơi.
+
+        Trả về danh sách dict (đường tới được trước, rẻ nhất trước) gồm 'point', 'goal',
+        'path_nodes', 'length', 'visited' và 'price'. Kết quả cũng được ghi vào cache dưới
+        gói "BFS" vì đường đi và số ô duyệt trùng khớp với một lượt BFS riêng.
+        """
+        if player_pos_pixels is None:
+            player_pos_pixels = self.player.rect.center
+        start = self.pixel_to_grid(*player_pos_pixels)
+        targets = {}
+        for center in self.point_manager.spawn_points_pixels:
+            targets.setdefault(self.pixel_to_grid(*center), []).append(center)
+
+        results = {}
+        if self._is_valid_position(*start):
+            # Bỏ các điểm ở vùng khác để lượt BFS dừng ngay khi gặp hết các điểm tới được.
+            reachable_goals = [goal for goal in targets if self._is_reachable(start, goal)]
+            take_peak_open()
+            started = time.perf_counter()
+            results, visited_total = PathfindingAlgorithms.multi_target_bfs(self.grid, start, reachable_goals)
+            wall_ms = (time.perf_counter() - started) * 1000
+            self.metrics.record(MULTI_POINT_QUOTE_NAME, start, None, wall_ms, visited_total, take_peak_open(),
+                                sum(len(path) for path, _ in results.values()))
+
+        quotes = []
+        for goal, centers in targets.items():
+            path_nodes, visited_count = results.get(goal, ([], 0))
+            if path_nodes:
+                cache_key = PathCache.make_key("BFS", start, goal, self.grid.version)
+                self.path_cache.put(cache_key, path_nodes, visited_count)
+            price = self.calculate_taxi_fare(len(path_nodes), visited_count)
+            for center in centers:
+                quotes.append({
+                    'point': center,
+                    'goal': goal,
+                    'path_nodes': path_nodes,
+                    'length': len(path_nodes),
+                    'visited': visited_count,
+                    'price': price,
+                })
+        quotes.sort(key=lambda quote: (quote['price'], quote['length']))
+        return quotes
+
+    def nearest_point(self, player_pos_pixels=None):
+        """Điểm giao hàng có giá rẻ nhất từ vị trí người chơi, hoặc None nếu không tới được điểm nào."""
+        quotes = self.quote_all_points(player_pos_pixels)
+        if quotes and quotes[0]['path_nodes']:
+            return quotes[0]
+        return None
+
     def find_path_to_point(self, player_pos_pixels, point_center_pixels):
         algo_name_default = config.DEFAULT_PATHFINDING_ALGORITHM_NAME
-        algorithm_func_default = ALGORITHM_MAP.get(algo_name_default)
+        algorithm_func_default = self.algorithm_funcs.get(algo_name_default)
 
         if not algorithm_func_default or not point_center_pixels:
              print(f"Lỗi (P-key): Không tìm thấy hàm cho {algo_name_default} hoặc không có điểm đến.")
@@ -270,24 +516,21 @@ class PathFinder:
            not self._is_valid_position(goal_row_def, goal_col_def):
             print(f"Debug (P-key): Vị trí không hợp lệ cho {algo_name_default}.")
             return [], None, False
-        
+
+        if not self._is_reachable((start_row_def, start_col_def), (goal_row_def, goal_col_def)):
+            print("Debug (P-key): Điểm đến nằm ở vùng không thể tới từ vị trí hiện tại.")
+            return [], None, False
+
+        if self.distance_fields.has((goal_row_def, goal_col_def)):
+            algo_name_default = PRECOMPUTED_ROUTE_NAME
+        elif config.INCREMENTAL_PLANNER_ENABLED:
+            algo_name_default = INCREMENTAL_ROUTE_NAME
+
         path_nodes_default, visited_count_default = [], 0 
         try:
-            if algo_name_default == "Backtracking": 
-                path_nodes_default, visited_count_default = algorithm_func_default(
-                    self.grid, (start_row_def, start_col_def), (goal_row_def, goal_col_def),
-                    max_depth_factor=config.BACKTRACKING_MAX_DEPTH_FACTOR, 
-                    max_calls_factor=config.BACKTRACKING_MAX_CALLS_FACTOR
-                )
-            elif algo_name_default == "BEAM_SEARCH":
-                 path_nodes_default, visited_count_default = algorithm_func_default(
-                    self.grid, (start_row_def, start_col_def), (goal_row_def, goal_col_def),
-                    beam_width=config.BEAM_SEARCH_WIDTH_DEFAULT
-                )
-            else:
-                path_nodes_default, visited_count_default = algorithm_func_default(
-                    self.grid, (start_row_def, start_col_def), (goal_row_def, goal_col_def)
-                )
+            path_nodes_default, visited_count_default = self._run_algorithm(
+                algo_name_default, (start_row_def, start_col_def), (goal_row_def, goal_col_def)
+            )
         except Exception as e:
             print(f"Lỗi khi chạy {algo_name_default} (P-key): {e}")
             return [], None, False
@@ -305,11 +548,104 @@ class PathFinder:
             print(f"Debug (P-key): Không đủ tiền cho {algo_name_default}. Cần: {cost_default_taxi}, Có: {self.player.money}")
             return [], None, False
         
-        actions = self._path_to_actions(path_nodes_default)
-        return actions, path_nodes_default, True
+        return self._path_to_actions(path_nodes_default), path_nodes_default, True
+
+    def toggle_metrics_overlay(self):
+        self.show_metrics = not self.show_metrics
 
     def draw(self, surface):
-        pass
+        """Vẽ bảng thống kê tìm đường (bật/tắt bằng F2) ở góc phải màn hình."""
+        if not self.show_metrics:
+            return
+        if self._metrics_font is None:
+            try:
+                self._metrics_font = pygame.font.Font(config.DEFAULT_FONT_PATH, 16)
+            except (pygame.error, FileNotFoundError):
+                self._metrics_font = pygame.font.SysFont(None, 18)
+        font = self._metrics_font
+
+        lines = [f"Tìm đường: {self.metrics.total_count} lượt, {self.metrics.speculative_count} tính trước "
+                 f"(giữ {len(self.metrics.records)})",
+                 "Thuật toán | Lượt | Cache | ms TB | Duyệt TB | Mở max | Tính trước"]
+        for row in self.metrics.summary():
+            peak = row['max_peak_open'] if row['max_peak_open'] is not None else "-"
+            lines.append(f"{row['algorithm']} | {row['queries']} | {row['cache_hits']} | {row['mean_ms']:.2f} | "
+                         f"{row['mean_expanded']:.0f} | {peak} | {row['speculative']}")
+        rendered = [font.render(line, True, config.WHITE) for line in lines]
+        width = max(text.get_width() for text in rendered) + 16
+        height = sum(text.get_height() + 2 for text in rendered) + 12
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        y = 6
+        for text in rendered:
+            panel.blit(text, (8, y))
+            y += text.get_height() + 2
+        surface.blit(panel, (self.screen_width - width - 10, 110))
+
+    def _step_search_tasks(self, jobs, budget_ms):
+        running_tasks = [job for job in jobs if not job.threaded and not job.done()]
+        if running_tasks:
+            slice_ms = budget_ms / len(running_tasks)
+            for task in running_tasks:
+                task.step(max_ms=slice_ms)
+
+    def _finish_search_task(self, algo_name, start, goal, task):
+        """Ghi sổ đo và cache cho một SearchTask đã xong (chạy theo khung hình hoặc trên pool luồng)."""
+        path_nodes, visited_count = task.result()
+        if task.speculative:
+            self._speculative_cost_ms[algo_name] = task.elapsed_ms
+        self.metrics.record(algo_name, start, goal, task.elapsed_ms, visited_count, task.peak_open, len(path_nodes),
+                            speculative=task.speculative)
+        cache_key = PathCache.make_key(algo_name, start, goal, self.grid.version)
+        self.path_cache.put(cache_key, path_nodes, visited_count)
+        return path_nodes, visited_count
+
+    def _update_speculative_quotes(self):
+        self._refresh_speculative_quotes()
+        if not self._speculative_quotes:
+            return
+        self._step_search_tasks(self._speculative_quotes.values(), config.TAXI_SPECULATIVE_BUDGET_MS)
+        start, goal, _ = self._speculative_key
+        for index, job in list(self._speculative_quotes.items()):
+            if not job.done():
+                continue
+            del self._speculative_quotes[index]
+            try:
+                self._finish_search_task(self.algorithms[index], start, goal, job)
+            except Exception as e_details:
+                print(f"Lỗi khi tính trước giá {self.algorithms[index]}: {e_details}")
 
     def update(self, delta_time):
-        pass
\ No newline at end of file
+        if config.TAXI_SPECULATIVE_QUOTES and not self.input_active:
+            self._update_speculative_quotes()
+        if not self._pending_quotes:
+            return
+        self._step_search_tasks(self._pending_quotes.values(), config.PATHFINDING_FRAME_BUDGET_MS)
+
+        for index, task in list(self._pending_quotes.items()):
+            if not task.done():
+                continue
+            del self._pending_quotes[index]
+            algo_name = self.algorithms[index]
+            try:
+                path_nodes, visited_count = self._finish_search_task(algo_name, self._quote_start,
+                                                                     self._quote_goal, task)
+            except Exception as e_details:
+                print(f"Lỗi khi chạy thử thuật toán {algo_name}: {e_details}")
+                self._apply_quote_result(index, algo_name, error_text=f"Lỗi: {type(e_details).__name__}")
+                continue
+            self._apply_quote_result(index, algo_name, path_nodes, visited_count)
+
+    def shutdown(self):
+        """Dừng pool tính giá; gọi khi thoát game."""
+        self.disable_input()
+        self._cancel_speculative_quotes()
+        if self._quote_executor is not None:
+            self._quote_executor.shutdown(wait=False, cancel_futures=True)
+            self._quote_executor = None
+        if config.PATHFINDING_METRICS_DUMP_PATH:
+            try:
+                count = self.metrics.dump(config.PATHFINDING_METRICS_DUMP_PATH)
+                print(f"Đã ghi {count} lượt tìm đường vào {config.PATHFINDING_METRICS_DUMP_PATH}")
+            except OSError as e:
+                print(f"Cảnh báo: Không ghi được sổ đo tìm đường: {e}")
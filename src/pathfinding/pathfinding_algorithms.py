@@ -2,299 +2,985 @@ import heapq
 from math import sqrt
 from collections import deque
 import numpy as np
-import src.config as config 
+import src.config as config
+from .grid_map import as_grid_map
+from .hierarchical import hierarchical_graph_for
+from .landmarks import landmark_heuristic_for
+from .metrics import note_peak_open
+
+INF = float('inf')
 
 class PathfindingAlgorithms:
     @staticmethod
     def heuristic(a, b):
-        if not (isinstance(a, (list, tuple)) and len(a) == 2 and 
-                isinstance(b, (list, tuple)) and len(b) == 2):
-            return float('inf') 
-        try:
-            return sqrt((a[0] - b[0])**2 + (a[1] - b[1])**2)
-        except TypeError: 
-            return float('inf')
+        return sqrt((a[0] - b[0])**2 + (a[1] - b[1])**2)
+
+    @staticmethod
+    def a_star(grid, start, goal, heuristic=None):
+        """`heuristic`: None (Euclid) hoặc đối tượng có `estimator(goal_idx)`, ví dụ LandmarkHeuristic."""
+        return _run_to_completion(PathfindingAlgorithms.a_star_steps(grid, start, goal, heuristic, yield_every=0))
 
     @staticmethod
-    def a_star(grid, start, goal):
+    def a_star_steps(grid, start, goal, heuristic=None, yield_every=config.PATHFINDING_SLICE_NODES):
+        grid = as_grid_map(grid)
+        with grid.workspace() as ws:
+            return (yield from PathfindingAlgorithms._a_star(grid, ws, start, goal, heuristic, yield_every))
+
+    @staticmethod
+    def _a_star(grid, ws, start, goal, heuristic, yield_every):
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
+        estimate = _estimator(grid, heuristic, goal_idx)
         visited_cnt = 0
-        rows, cols = len(grid), len(grid[0])
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        peak_open = 0
+        budget = yield_every
 
-        g_score = {}
-        for r in range(rows):
-            for c in range(cols):
-                g_score[(r, c)] = float('inf')
-        g_score[start] = 0
+        gen = ws.begin()
+        stamp, g_score, came_from = ws.stamp, ws.cost, ws.parent
+        stamp[start_idx] = gen
+        g_score[start_idx] = 0
+        came_from[start_idx] = -1
 
-        start_h = PathfindingAlgorithms.heuristic(start, goal)
-        open_set = [(g_score[start] + start_h, start_h, start)] 
-        
-        came_from = {}
-        open_set_hash = {start} 
+        start_h = estimate(start_idx)
+        open_set = [(start_h, start_h, start_idx)]
 
         while open_set:
-            current_f, current_h, current_node = heapq.heappop(open_set) 
-
-            if current_f > g_score[current_node] + current_h : 
-                 continue
-
-            if current_node == goal: 
-                path = []
-                temp = current_node 
-                while temp in came_from:
-                    path.append(temp)
-                    temp = came_from[temp]
-                path.append(start)
-                path.reverse()
-                return path, visited_cnt
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+            current_f, current_h, current = heapq.heappop(open_set)
+            current_g = g_score[current]
 
-            visited_cnt +=1
+            if current_f > current_g + current_h:
+                continue
+
+            if current == goal_idx:
+                path = yield from _trace_parents_steps(grid, came_from, current, yield_every, visited_cnt)
+                note_peak_open(peak_open)
+                return path, visited_cnt
 
-            for dr, dc in directions:
-                neighbor = (current_node[0] + dr, current_node[1] + dc) 
+            visited_cnt += 1
+            budget -= 1
+            if not budget:
+                yield visited_cnt
+                budget = yield_every
 
-                if (0 <= neighbor[0] < rows and
-                    0 <= neighbor[1] < cols and
-                    grid[neighbor[0]][neighbor[1]] == 0): 
-                    
-                    tentative_g_score = g_score[current_node] + 1 
+            tentative_g_score = current_g + 1
 
-                    if tentative_g_score < g_score[neighbor]:
-                        came_from[neighbor] = current_node 
-                        g_score[neighbor] = tentative_g_score
-                        neighbor_h = PathfindingAlgorithms.heuristic(neighbor, goal)
-                        neighbor_f = tentative_g_score + neighbor_h
-                        
-                        heapq.heappush(open_set, (neighbor_f, neighbor_h, neighbor))
+            for offset in offsets:
+                neighbor = current + offset
+                if cells[neighbor] == 0 and (stamp[neighbor] != gen or tentative_g_score < g_score[neighbor]):
+                    stamp[neighbor] = gen
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    neighbor_h = estimate(neighbor)
+                    heapq.heappush(open_set, (tentative_g_score + neighbor_h, neighbor_h, neighbor))
+        note_peak_open(peak_open)
         return [], visited_cnt
 
     @staticmethod
     def dijkstra(grid, start, goal):
+        return _run_to_completion(PathfindingAlgorithms.dijkstra_steps(grid, start, goal, yield_every=0))
+
+    @staticmethod
+    def dijkstra_steps(grid, start, goal, yield_every=config.PATHFINDING_SLICE_NODES):
+        grid = as_grid_map(grid)
+        with grid.workspace() as ws:
+            return (yield from PathfindingAlgorithms._dijkstra(grid, ws, start, goal, yield_every))
+
+    @staticmethod
+    def _dijkstra(grid, ws, start, goal, yield_every):
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
         visited_count = 0
-        rows, cols = len(grid), len(grid[0])
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        distance = {node: float('inf') for r_idx, r in enumerate(grid) for c_idx, _ in enumerate(r) for node in [(r_idx, c_idx)]}
-        distance[start] = 0
-        
-        queue = [(0, start)] 
-        came_from = {}
-        
-        processed_nodes = set() 
+        peak_open = 0
+        budget = yield_every
+
+        gen = ws.begin()
+        stamp, distance, came_from = ws.stamp, ws.cost, ws.parent
+        stamp[start_idx] = gen
+        distance[start_idx] = 0
+        came_from[start_idx] = -1
+        queue = [(0, start_idx)]
 
         while queue:
+            if len(queue) > peak_open:
+                peak_open = len(queue)
             dist, current = heapq.heappop(queue)
 
-            if current in processed_nodes:
+            # Mỗi ô chỉ được đẩy lại khi khoảng cách giảm hẳn, nên mục cũ có dist lớn hơn.
+            if dist > distance[current]:
                 continue
-            processed_nodes.add(current)
             visited_count += 1
-
-            if current == goal:
-                path = []
-                temp = current
-                while temp in came_from:
-                    path.append(temp)
-                    temp = came_from[temp]
-                path.append(start)
-                path.reverse()
+            budget -= 1
+            if not budget:
+                yield visited_count
+                budget = yield_every
+
+            if current == goal_idx:
+                path = yield from _trace_parents_steps(grid, came_from, current, yield_every, visited_count)
+                note_peak_open(peak_open)
                 return path, visited_count
 
-            for dr, dc in directions:
-                neighbor = (current[0] + dr, current[1] + dc)
-                if (0 <= neighbor[0] < rows and
-                    0 <= neighbor[1] < cols and
-                    grid[neighbor[0]][neighbor[1]] == 0): 
-                    
-                    new_dist = dist + 1 
-                    if new_dist < distance[neighbor]: 
-                        distance[neighbor] = new_dist
-                        came_from[neighbor] = current
-                        heapq.heappush(queue, (new_dist, neighbor))
+            new_dist = dist + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if cells[neighbor] == 0 and (stamp[neighbor] != gen or new_dist < distance[neighbor]):
+                    stamp[neighbor] = gen
+                    distance[neighbor] = new_dist
+                    came_from[neighbor] = current
+                    heapq.heappush(queue, (new_dist, neighbor))
+        note_peak_open(peak_open)
         return [], visited_count
 
+    @staticmethod
+    def jump_point_search(grid, start, goal):
+        """
+        Jump Point Search cho lưới 4 hướng, chi phí đồng nhất.
+
+        Thay vì mở rộng từng ô như A*, thuật toán "nhảy" thẳng theo một hướng cho
+        tới khi gặp ô có láng giềng bắt buộc hoặc đích, nên bỏ qua phần lớn các
+        đường đi đối xứng trong hành lang thoáng. `visited_count` là số điểm nhảy
+        được mở rộng; đường trả về vẫn là danh sách từng ô như các thuật toán khác.
+        """
+        return _run_to_completion(PathfindingAlgorithms.jump_point_search_steps(grid, start, goal, yield_every=0))
+
+    @staticmethod
+    def jump_point_search_steps(grid, start, goal, yield_every=config.PATHFINDING_SLICE_NODES):
+        grid = as_grid_map(grid)
+        with grid.workspace() as ws:
+            return (yield from PathfindingAlgorithms._jump_point_search(grid, ws, start, goal, yield_every))
+
+    @staticmethod
+    def _jump_point_search(grid, ws, start, goal, yield_every):
+        cells, stride = grid.cells, grid.stride
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
+        goal_r, goal_c = divmod(goal_idx, stride)
+        visited_cnt = 0
+        peak_open = 0
+        budget = yield_every
+
+        gen = ws.begin()
+        stamp, g_score, came_from = ws.stamp, ws.cost, ws.parent
+        stamp[start_idx] = gen
+        g_score[start_idx] = 0
+        came_from[start_idx] = -1
+
+        start_r, start_c = divmod(start_idx, stride)
+        start_h = abs(start_r - goal_r) + abs(start_c - goal_c)
+        open_set = [(start_h, start_h, start_idx)]
+
+        while open_set:
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+            current_f, current_h, current = heapq.heappop(open_set)
+            current_g = g_score[current]
+
+            if current_f > current_g + current_h:
+                continue
+
+            if current == goal_idx:
+                path = yield from _expand_jump_path_steps(grid, _trace_parents_idx(came_from, current),
+                                                          yield_every, visited_cnt)
+                note_peak_open(peak_open)
+                return path, visited_cnt
+
+            visited_cnt += 1
+            budget -= 1
+            if not budget:
+                yield visited_cnt
+                budget = yield_every
+
+            parent = came_from[current]
+            if parent == -1:
+                directions = (-stride, stride, -1, 1)
+            else:
+                diff = current - parent
+                if -stride < diff < stride:
+                    d = 1 if diff > 0 else -1
+                    directions = (d, -stride, stride)
+                else:
+                    d = stride if diff > 0 else -stride
+                    directions = (d, -1, 1)
+
+            for d in directions:
+                if cells[current + d]:
+                    continue
+                if d == 1 or d == -1:
+                    jump_point = _jump_horizontal(cells, current + d, d, stride, goal_idx)
+                    step_cost = abs(jump_point - current) if jump_point != -1 else 0
+                else:
+                    jump_point = _jump_vertical(cells, current + d, d, stride, goal_idx)
+                    step_cost = abs(jump_point - current) // stride if jump_point != -1 else 0
+                if jump_point == -1:
+                    continue
+
+                tentative_g_score = current_g + step_cost
+                if stamp[jump_point] != gen or tentative_g_score < g_score[jump_point]:
+                    stamp[jump_point] = gen
+                    came_from[jump_point] = current
+                    g_score[jump_point] = tentative_g_score
+                    r, c = divmod(jump_point, stride)
+                    jump_h = abs(r - goal_r) + abs(c - goal_c)
+                    heapq.heappush(open_set, (tentative_g_score + jump_h, jump_h, jump_point))
+        note_peak_open(peak_open)
+        return [], visited_cnt
+
     @staticmethod
     def bfs(grid, start, goal):
+        return _run_to_completion(PathfindingAlgorithms.bfs_steps(grid, start, goal, yield_every=0))
+
+    @staticmethod
+    def bfs_steps(grid, start, goal, yield_every=config.PATHFINDING_SLICE_NODES):
+        grid = as_grid_map(grid)
+        with grid.workspace() as ws:
+            return (yield from PathfindingAlgorithms._bfs(grid, ws, start, goal, yield_every))
+
+    @staticmethod
+    def _bfs(grid, ws, start, goal, yield_every):
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
         visited_cnt = 0
-        rows, cols = len(grid), len(grid[0])
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        queue = deque([start])
-        visited = {start} 
-        came_from = {}
+        peak_open = 0
+        budget = yield_every
+        queue = deque([start_idx])
+
+        gen = ws.begin()
+        visited, came_from = ws.stamp, ws.parent
+        visited[start_idx] = gen
+        came_from[start_idx] = -1
 
         while queue:
+            if len(queue) > peak_open:
+                peak_open = len(queue)
             current = queue.popleft()
-            visited_cnt += 1 
-
-            if current == goal:
-                path = []
-                temp = current
-                while temp in came_from:
-                    path.append(temp)
-                    temp = came_from[temp]
-                path.append(start)
-                path.reverse()
+            visited_cnt += 1
+            budget -= 1
+            if not budget:
+                yield visited_cnt
+                budget = yield_every
+
+            if current == goal_idx:
+                path = yield from _trace_parents_steps(grid, came_from, current, yield_every, visited_cnt)
+                note_peak_open(peak_open)
                 return path, visited_cnt
 
-            for dr, dc in directions:
-                neighbor = (current[0] + dr, current[1] + dc)
-                if (0 <= neighbor[0] < rows and
-                    0 <= neighbor[1] < cols and
-                    grid[neighbor[0]][neighbor[1]] == 0 and
-                    neighbor not in visited):
-                    visited.add(neighbor)
+            for offset in offsets:
+                neighbor = current + offset
+                if cells[neighbor] == 0 and visited[neighbor] != gen:
+                    visited[neighbor] = gen
                     came_from[neighbor] = current
                     queue.append(neighbor)
+        note_peak_open(peak_open)
+        return [], visited_cnt
+
+    @staticmethod
+    def multi_target_bfs(grid, start, goals):
+        """
+        Một lượt BFS từ `start` tới nhiều ô đích cùng lúc, dừng khi đã gặp hết các đích.
+
+        Trả về `(results, visited_count)` với `results[goal] = (path, visited_at)`:
+        `path` và `visited_at` giống hệt kết quả của `bfs(grid, start, goal)`: đường đi
+        (rỗng nếu không tới được) và số ô đã lấy ra khỏi hàng đợi khi tới đích đó.
+        """
+        grid = as_grid_map(grid)
+        results = {tuple(goal): ([], 0) for goal in goals}
+        remaining = {}
+        for goal in results:
+            if grid.in_bounds(*goal):
+                remaining[grid.index(*goal)] = goal
+        if not grid.is_walkable(*start) or not remaining:
+            return results, 0
+
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        start_idx = grid.index(*start)
+        visited_cnt = 0
+        peak_open = 0
+        with grid.workspace() as ws:
+            gen = ws.begin()
+            stamp, parent = ws.stamp, ws.parent
+            stamp[start_idx] = gen
+            parent[start_idx] = -1
+            queue = deque([start_idx])
+            while queue and remaining:
+                if len(queue) > peak_open:
+                    peak_open = len(queue)
+                current = queue.popleft()
+                visited_cnt += 1
+                goal = remaining.pop(current, None)
+                if goal is not None:
+                    results[goal] = (_trace_parents(grid, parent, current), visited_cnt)
+                for offset in offsets:
+                    neighbor = current + offset
+                    if cells[neighbor] == 0 and stamp[neighbor] != gen:
+                        stamp[neighbor] = gen
+                        parent[neighbor] = current
+                        queue.append(neighbor)
+        note_peak_open(peak_open)
+        for goal in remaining.values():
+            results[goal] = ([], visited_cnt)
+        return results, visited_cnt
+
+    @staticmethod
+    def bidirectional_bfs(grid, start, goal):
+        return _run_to_completion(PathfindingAlgorithms.bidirectional_bfs_steps(grid, start, goal, yield_every=0))
+
+    @staticmethod
+    def bidirectional_bfs_steps(grid, start, goal, yield_every=config.PATHFINDING_SLICE_NODES):
+        """
+        BFS đồng thời từ điểm đầu và điểm đích, mỗi lượt mở rộng trọn một tầng của
+        phía có biên nhỏ hơn. Đường tìm được vẫn ngắn nhất, nhưng số ô duyệt xấp xỉ
+        căn bậc hai so với BFS một chiều trên bản đồ thoáng.
+        """
+        grid = as_grid_map(grid)
+        with grid.workspace() as forward_ws, grid.workspace() as backward_ws:
+            return (yield from PathfindingAlgorithms._bidirectional_bfs(
+                grid, forward_ws, backward_ws, start, goal, yield_every))
+
+    @staticmethod
+    def _bidirectional_bfs(grid, forward_ws, backward_ws, start, goal, yield_every):
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
+        visited_cnt = 0
+        peak_open = 0
+        budget = yield_every
+        if start_idx == goal_idx:
+            note_peak_open(1)
+            return [grid.coords(start_idx)], 1
+
+        sides = []
+        for ws, root in ((forward_ws, start_idx), (backward_ws, goal_idx)):
+            gen = ws.begin()
+            ws.stamp[root] = gen
+            ws.cost[root] = 0
+            ws.parent[root] = -1
+            sides.append((ws, gen))
+        frontiers = [[start_idx], [goal_idx]]
+
+        best_length, meeting_node = INF, -1
+        while frontiers[0] and frontiers[1]:
+            if len(frontiers[0]) + len(frontiers[1]) > peak_open:
+                peak_open = len(frontiers[0]) + len(frontiers[1])
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            (ws, gen), (other_ws, other_gen) = sides[side], sides[1 - side]
+            stamp, distance, came_from = ws.stamp, ws.cost, ws.parent
+            other_stamp, other_distance = other_ws.stamp, other_ws.cost
+
+            next_frontier = []
+            for current in frontiers[side]:
+                visited_cnt += 1
+                budget -= 1
+                if not budget:
+                    yield visited_cnt
+                    budget = yield_every
+
+                new_dist = distance[current] + 1
+                for offset in offsets:
+                    neighbor = current + offset
+                    if cells[neighbor] != 0 or stamp[neighbor] == gen:
+                        continue
+                    stamp[neighbor] = gen
+                    distance[neighbor] = new_dist
+                    came_from[neighbor] = current
+                    if other_stamp[neighbor] == other_gen and new_dist + other_distance[neighbor] < best_length:
+                        best_length = new_dist + other_distance[neighbor]
+                        meeting_node = neighbor
+                    next_frontier.append(neighbor)
+
+            # Chỉ dừng sau khi xong trọn một tầng để chắc chắn điểm gặp là tốt nhất.
+            if meeting_node != -1:
+                path = yield from _join_bidirectional_path_steps(grid, forward_ws.parent, backward_ws.parent,
+                                                                 meeting_node, yield_every, visited_cnt)
+                note_peak_open(peak_open)
+                return path, visited_cnt
+            frontiers[side] = next_frontier
+        note_peak_open(peak_open)
         return [], visited_cnt
-    
+
+    @staticmethod
+    def bidirectional_a_star(grid, start, goal, heuristic=None):
+        return _run_to_completion(
+            PathfindingAlgorithms.bidirectional_a_star_steps(grid, start, goal, heuristic, yield_every=0))
+
+    @staticmethod
+    def bidirectional_a_star_steps(grid, start, goal, heuristic=None, yield_every=config.PATHFINDING_SLICE_NODES):
+        """
+        A* chạy đồng thời từ hai đầu với thế cân bằng: phía xuôi dùng
+        p(n) = (h_đích(n) - h_đầu(n)) / 2, phía ngược dùng -p(n). Hai thế này cho cùng một
+        trọng số cạnh đã hiệu chỉnh, nên có thể dừng ngay khi tổng khóa nhỏ nhất của hai
+        tập mở không còn nhỏ hơn đường tốt nhất đã nối được mà kết quả vẫn tối ưu.
+        """
+        grid = as_grid_map(grid)
+        with grid.workspace() as forward_ws, grid.workspace() as backward_ws:
+            return (yield from PathfindingAlgorithms._bidirectional_a_star(
+                grid, forward_ws, backward_ws, start, goal, heuristic, yield_every))
+
+    @staticmethod
+    def _bidirectional_a_star(grid, forward_ws, backward_ws, start, goal, heuristic, yield_every):
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
+        to_goal = _estimator(grid, heuristic, goal_idx)
+        to_start = _estimator(grid, heuristic, start_idx)
+        visited_cnt = 0
+        peak_open = 0
+        budget = yield_every
+
+        sides = []
+        open_sets = []
+        for ws, root, sign in ((forward_ws, start_idx, 0.5), (backward_ws, goal_idx, -0.5)):
+            gen = ws.begin()
+            ws.stamp[root] = gen
+            ws.cost[root] = 0
+            ws.parent[root] = -1
+            root_p = sign * (to_goal(root) - to_start(root))
+            sides.append((ws, gen, sign))
+            open_sets.append([(root_p, root_p, root)])
+
+        best_length, meeting_node = INF, -1
+        if start_idx == goal_idx:
+            best_length, meeting_node = 0, start_idx
+
+        while open_sets[0] and open_sets[1]:
+            if open_sets[0][0][0] + open_sets[1][0][0] >= best_length:
+                break
+            if len(open_sets[0]) + len(open_sets[1]) > peak_open:
+                peak_open = len(open_sets[0]) + len(open_sets[1])
+            side = 0 if len(open_sets[0]) <= len(open_sets[1]) else 1
+            ws, gen, sign = sides[side]
+            other_ws, other_gen = sides[1 - side][0], sides[1 - side][1]
+            stamp, g_score, came_from = ws.stamp, ws.cost, ws.parent
+            other_stamp, other_g = other_ws.stamp, other_ws.cost
+            open_set = open_sets[side]
+
+            current_key, current_p, current = heapq.heappop(open_set)
+            current_g = g_score[current]
+            if current_key > current_g + current_p:
+                continue
+
+            visited_cnt += 1
+            budget -= 1
+            if not budget:
+                yield visited_cnt
+                budget = yield_every
+
+            tentative_g_score = current_g + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if cells[neighbor] == 0 and (stamp[neighbor] != gen or tentative_g_score < g_score[neighbor]):
+                    stamp[neighbor] = gen
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    if other_stamp[neighbor] == other_gen and tentative_g_score + other_g[neighbor] < best_length:
+                        best_length = tentative_g_score + other_g[neighbor]
+                        meeting_node = neighbor
+                    neighbor_p = sign * (to_goal(neighbor) - to_start(neighbor))
+                    heapq.heappush(open_set, (tentative_g_score + neighbor_p, neighbor_p, neighbor))
+
+        if meeting_node == -1:
+            note_peak_open(peak_open)
+            return [], visited_cnt
+        path = yield from _join_bidirectional_path_steps(grid, forward_ws.parent, backward_ws.parent,
+                                                         meeting_node, yield_every, visited_cnt)
+        note_peak_open(peak_open)
+        return path, visited_cnt
+
     @staticmethod
-    def greedy_bfs(grid, start, goal):
+    def hpa_star(grid, start, goal):
+        """
+        HPA*: tìm trên đồ thị cụm/cửa dựng sẵn rồi làm mịn thành từng ô.
+        Gần tối ưu, chi phí truy vấn gần như không phụ thuộc kích thước bản đồ.
+        """
+        return hierarchical_graph_for(grid).find_path(start, goal)
+
+    @staticmethod
+    def greedy_bfs(grid, start, goal, heuristic=None):
+        return _run_to_completion(PathfindingAlgorithms.greedy_bfs_steps(grid, start, goal, heuristic, yield_every=0))
+
+    @staticmethod
+    def greedy_bfs_steps(grid, start, goal, heuristic=None, yield_every=config.PATHFINDING_SLICE_NODES):
+        grid = as_grid_map(grid)
+        with grid.workspace() as ws:
+            return (yield from PathfindingAlgorithms._greedy_bfs(grid, ws, start, goal, heuristic, yield_every))
+
+    @staticmethod
+    def _greedy_bfs(grid, ws, start, goal, heuristic, yield_every):
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
+        estimate = _estimator(grid, heuristic, goal_idx)
         visited_cnt = 0
-        rows, cols = len(grid), len(grid[0])
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        open_set = [(PathfindingAlgorithms.heuristic(start, goal), start)]
-        came_from = {}
-        visited_nodes = {start} 
+        peak_open = 0
+        budget = yield_every
+
+        open_set = [(estimate(start_idx), start_idx)]
+        gen = ws.begin()
+        visited_nodes, came_from = ws.stamp, ws.parent
+        visited_nodes[start_idx] = gen
+        came_from[start_idx] = -1
 
         while open_set:
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
             _, current = heapq.heappop(open_set)
-            visited_cnt +=1 
-
-            if current == goal:
-                path = []
-                temp = current
-                while temp in came_from:
-                    path.append(temp)
-                    temp = came_from[temp]
-                path.append(start)
-                path.reverse()
+            visited_cnt += 1
+            budget -= 1
+            if not budget:
+                yield visited_cnt
+                budget = yield_every
+
+            if current == goal_idx:
+                path = yield from _trace_parents_steps(grid, came_from, current, yield_every, visited_cnt)
+                note_peak_open(peak_open)
                 return path, visited_cnt
 
-            for dr, dc in directions:
-                neighbor = (current[0] + dr, current[1] + dc)
-                if (0 <= neighbor[0] < rows and
-                    0 <= neighbor[1] < cols and
-                    grid[neighbor[0]][neighbor[1]] == 0 and
-                    neighbor not in visited_nodes): 
-                        visited_nodes.add(neighbor) 
-                        came_from[neighbor] = current
-                        priority = PathfindingAlgorithms.heuristic(neighbor, goal)
-                        heapq.heappush(open_set, (priority, neighbor))
+            for offset in offsets:
+                neighbor = current + offset
+                if cells[neighbor] == 0 and visited_nodes[neighbor] != gen:
+                    visited_nodes[neighbor] = gen
+                    came_from[neighbor] = current
+                    heapq.heappush(open_set, (estimate(neighbor), neighbor))
+        note_peak_open(peak_open)
         return [], visited_cnt
-    
+
     @staticmethod
-    def beam_search(grid, start, goal, beam_width=config.BEAM_SEARCH_WIDTH_DEFAULT):
-        rows, cols = len(grid), len(grid[0])
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    def beam_search(grid, start, goal, beam_width=config.BEAM_SEARCH_WIDTH_DEFAULT, heuristic=None):
+        return _run_to_completion(PathfindingAlgorithms.beam_search_steps(grid, start, goal, beam_width, heuristic,
+                                                                           yield_every=0))
 
+    @staticmethod
+    def beam_search_steps(grid, start, goal, beam_width=config.BEAM_SEARCH_WIDTH_DEFAULT, heuristic=None,
+                          yield_every=config.PATHFINDING_SLICE_NODES):
+        """
+        Tìm kiếm theo chùm: mỗi tầng chỉ giữ `beam_width` ứng viên gần đích nhất.
+
+        Ứng viên được lưu thành nút (ô, nút cha) trong một mảng dùng chung thay vì sao
+        chép cả đường đi, ô đã vào chùm được đánh dấu trên bitmap của workspace nên
+        không bị mở rộng lại, và chùm kế tiếp được chọn bằng heapq.nsmallest.
+        """
         if not (isinstance(start, (list, tuple)) and len(start) == 2):
             return [], 0
-        
-        current_beam = [(PathfindingAlgorithms.heuristic(start, goal), [start])]
-        
-        expanded_nodes_for_count = set()
-
-        for _iteration_count in range(rows * cols): 
-            potential_next_candidates = []
-
-            if not current_beam:
-                return [], len(expanded_nodes_for_count)
-            
-            for h_value, path in current_beam:
-                current_node = path[-1]
-
-                if not (isinstance(current_node, (list, tuple)) and len(current_node) == 2):
-                    continue 
-
-                if current_node not in expanded_nodes_for_count:
-                    expanded_nodes_for_count.add(current_node)
-
-                if current_node == goal:
-                    return path, len(expanded_nodes_for_count)
-
-                for dr, dc in directions:
-                    neighbor_r, neighbor_c = current_node[0] + dr, current_node[1] + dc
-                    neighbor = (neighbor_r, neighbor_c)
-
-                    if (0 <= neighbor_r < rows and
-                        0 <= neighbor_c < cols and
-                        grid[neighbor_r][neighbor_c] == 0):
-                        if neighbor in path: 
-                            continue
-                        
-                        new_path = path + [neighbor]
-                        heuristic_val = PathfindingAlgorithms.heuristic(neighbor, goal)
-                        potential_next_candidates.append((heuristic_val, new_path))
-            
-            if not potential_next_candidates: 
-                return [], len(expanded_nodes_for_count)
-
-            potential_next_candidates.sort(key=lambda x: x[0]) 
-            current_beam = potential_next_candidates[:beam_width]
-        
-        return [], len(expanded_nodes_for_count)
-    
+
+        grid = as_grid_map(grid)
+        with grid.workspace() as ws:
+            return (yield from PathfindingAlgorithms._beam_search(grid, ws, start, goal, beam_width, heuristic,
+                                                                  yield_every))
+
     @staticmethod
-    def backtracking_search(grid, start, goal, max_depth_factor=1.5, max_calls_factor=5):
-        rows, cols = len(grid), len(grid[0])
-        MAX_RECURSION_DEPTH = int(rows * cols * max_depth_factor) 
-        MAX_VISITED_CALLS = int(rows * cols * max_calls_factor)    
-        
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)] 
-        
-        _visited_call_count = 0 
-     
-        def solve_recursive(current_r, current_c, current_path, current_depth):
-            nonlocal _visited_call_count 
-            _visited_call_count += 1 
-
-            if current_depth > MAX_RECURSION_DEPTH:
-                return None 
-            if _visited_call_count > MAX_VISITED_CALLS:
-                return None 
+    def _beam_search(grid, ws, start, goal, beam_width, heuristic, yield_every):
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
+        estimate = _estimator(grid, heuristic, goal_idx)
+
+        gen = ws.begin()
+        visited = ws.stamp
+        visited[start_idx] = gen
+        arena_cell = [start_idx]
+        arena_parent = [-1]
+        current_beam = [0]
+        expanded_count = 0
+        peak_open = 1
+        budget = yield_every
+
+        while current_beam:
+            candidates = {}
+            for node in current_beam:
+                current = arena_cell[node]
+                expanded_count += 1
+                budget -= 1
+                if not budget:
+                    yield expanded_count
+                    budget = yield_every
+
+                if current == goal_idx:
+                    path = yield from _trace_parents_steps(grid, arena_parent, node, yield_every, expanded_count,
+                                                           cell_of=arena_cell)
+                    note_peak_open(peak_open)
+                    return path, expanded_count
+
+                for offset in offsets:
+                    neighbor = current + offset
+                    if cells[neighbor] == 0 and visited[neighbor] != gen and neighbor not in candidates:
+                        candidates[neighbor] = (estimate(neighbor), neighbor, node)
+
+            if len(candidates) > peak_open:
+                peak_open = len(candidates)
+            current_beam = []
+            for _, neighbor, parent in heapq.nsmallest(beam_width, candidates.values()):
+                visited[neighbor] = gen
+                current_beam.append(len(arena_cell))
+                arena_cell.append(neighbor)
+                arena_parent.append(parent)
+
+        note_peak_open(peak_open)
+        return [], expanded_count
 
-            current_path.append((current_r, current_c)) 
+    @staticmethod
+    def backtracking_search(grid, start, goal, max_depth_factor=1.5, max_calls_factor=5, branch_and_bound=False):
+        return _run_to_completion(PathfindingAlgorithms.backtracking_search_steps(
+            grid, start, goal, max_depth_factor, max_calls_factor, branch_and_bound, yield_every=0))
 
-            if (current_r, current_c) == goal:
-                return list(current_path) 
+    @staticmethod
+    def backtracking_search_steps(grid, start, goal, max_depth_factor=1.5, max_calls_factor=5,
+                                  branch_and_bound=False, yield_every=config.PATHFINDING_SLICE_NODES):
+        """
+        DFS quay lui dùng ngăn xếp tường minh (không đệ quy, không giới hạn độ sâu của
+        Python) và một bitmap "đang nằm trên đường" để kiểm tra ô đã đi trong O(1).
+
+        Với `branch_and_bound=True`, DFS ưu tiên hướng về đích và lặp sâu dần theo cận dưới
+        độ sâu + khoảng cách Manhattan: bỏ nhánh khi tới một ô ở độ sâu không tốt hơn lần
+        trước, khi vượt cận của vòng hiện tại hoặc khi không thể ngắn hơn đường tốt nhất đã
+        có. Chỉ trả về đường của một vòng đã duyệt trọn, nên đó là đường ngắn nhất; nếu hết
+        ngân sách `max_calls_factor` giữa một vòng thì trả về rỗng (coi như không tìm thấy)
+        thay vì một đường chưa chứng minh được là ngắn nhất.
+        """
+        grid = as_grid_map(grid)
+        with grid.workspace() as ws:
+            if branch_and_bound:
+                search = PathfindingAlgorithms._backtracking_branch_and_bound(
+                    grid, ws, start, goal, max_depth_factor, max_calls_factor, yield_every)
+            else:
+                search = PathfindingAlgorithms._backtracking(
+                    grid, ws, start, goal, max_depth_factor, max_calls_factor, yield_every)
+            return (yield from search)
 
-            for dr, dc in directions:
-                next_r, next_c = current_r + dr, current_c + dc
+    @staticmethod
+    def _backtracking(grid, ws, start, goal, max_depth_factor, max_calls_factor, yield_every):
+        cells, offsets = grid.cells, grid.neighbor_offsets
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
+        MAX_RECURSION_DEPTH = int(grid.rows * grid.cols * max_depth_factor)
+        MAX_VISITED_CALLS = int(grid.rows * grid.cols * max_calls_factor)
+
+        _visited_call_count = 1
+        budget = yield_every
+        if MAX_RECURSION_DEPTH < 0 or _visited_call_count > MAX_VISITED_CALLS:
+            return [], _visited_call_count
 
-                if (0 <= next_r < rows and 0 <= next_c < cols and
-                    grid[next_r][next_c] == 0 and
-                    (next_r, next_c) not in current_path): 
+        gen = ws.begin()
+        on_path = ws.stamp
+        on_path[start_idx] = gen
+        current_path = [start_idx]
+        next_direction = [0]
+        peak_open = 1
+        if start_idx == goal_idx:
+            note_peak_open(peak_open)
+            return [grid.coords(start_idx)], _visited_call_count
+
+        while current_path:
+            direction = next_direction[-1]
+            if direction == len(offsets):
+                on_path[current_path.pop()] = 0
+                next_direction.pop()
+                continue
+            next_direction[-1] = direction + 1
+
+            next_idx = current_path[-1] + offsets[direction]
+            if cells[next_idx] != 0 or on_path[next_idx] == gen:
+                continue
 
-                    found_path = solve_recursive(next_r, next_c, current_path, current_depth + 1) 
-                    if found_path:
-                        return found_path 
+            _visited_call_count += 1
+            budget -= 1
+            if not budget:
+                yield _visited_call_count
+                budget = yield_every
 
-            current_path.pop() 
-            return None
+            if len(current_path) > MAX_RECURSION_DEPTH or _visited_call_count > MAX_VISITED_CALLS:
+                continue
+
+            on_path[next_idx] = gen
+            current_path.append(next_idx)
+            next_direction.append(0)
+            if len(current_path) > peak_open:
+                peak_open = len(current_path)
+            if next_idx == goal_idx:
+                path = yield from _coords_steps(grid, current_path, yield_every, _visited_call_count)
+                note_peak_open(peak_open)
+                return path, _visited_call_count
+
+        note_peak_open(peak_open)
+        return [], _visited_call_count
+
+    @staticmethod
+    def _backtracking_branch_and_bound(grid, ws, start, goal, max_depth_factor, max_calls_factor, yield_every):
+        cells, offsets, stride = grid.cells, grid.neighbor_offsets, grid.stride
+        start_idx, goal_idx = grid.index(*start), grid.index(*goal)
+        goal_r, goal_c = divmod(goal_idx, stride)
+        MAX_RECURSION_DEPTH = int(grid.rows * grid.cols * max_depth_factor)
+        MAX_VISITED_CALLS = int(grid.rows * grid.cols * max_calls_factor)
+
+        _visited_call_count = 1
+        budget = yield_every
+        if MAX_RECURSION_DEPTH < 0 or _visited_call_count > MAX_VISITED_CALLS:
+            return [], _visited_call_count
+        if start_idx == goal_idx:
+            return [grid.coords(start_idx)], _visited_call_count
+
+        def distance_to_goal(idx):
+            r, c = divmod(idx, stride)
+            return abs(r - goal_r) + abs(c - goal_c)
+
+        def ordered_neighbors(idx):
+            candidates = [(distance_to_goal(idx + offset), idx + offset)
+                          for offset in offsets if cells[idx + offset] == 0]
+            candidates.sort()
+            return [neighbor for _, neighbor in candidates]
+
+        # Mỗi vòng là một DFS chỉ đi qua các ô có độ sâu + khoảng cách Manhattan <= bound, đồng thời
+        # cắt mọi nhánh không thể ngắn hơn đường tốt nhất đã tìm được. Khi một vòng kết thúc với một
+        # đường tới đích thì đó là đường ngắn nhất; nếu không, bound được nới ra và tìm lại.
+        # best_depth[idx] chỉ hợp lệ khi stamp[idx] == gen: độ sâu nhỏ nhất đã tới ô đó trong vòng này.
+        stamp, best_depth = ws.stamp, ws.cost
+        best_path, best_length = None, INF
+        peak_open = 1
+        bound = distance_to_goal(start_idx)
+        while bound <= MAX_RECURSION_DEPTH:
+            gen = ws.begin()
+            stamp[start_idx] = gen
+            best_depth[start_idx] = 0
+            current_path = [start_idx]
+            choices = [ordered_neighbors(start_idx)]
+            next_choice = [0]
+            next_bound = INF
+
+            while current_path:
+                choice = next_choice[-1]
+                options = choices[-1]
+                if choice == len(options):
+                    current_path.pop()
+                    choices.pop()
+                    next_choice.pop()
+                    continue
+                next_choice[-1] = choice + 1
+
+                next_idx = options[choice]
+                depth = len(current_path)
+                if stamp[next_idx] == gen and depth >= best_depth[next_idx]:
+                    continue
+                estimate = depth + distance_to_goal(next_idx)
+                if estimate >= best_length:
+                    continue
+                if estimate > bound:
+                    if estimate < next_bound:
+                        next_bound = estimate
+                    continue
+
+                _visited_call_count += 1
+                budget -= 1
+                if not budget:
+                    yield _visited_call_count
+                    budget = yield_every
+
+                if _visited_call_count > MAX_VISITED_CALLS:
+                    break
+
+                stamp[next_idx] = gen
+                best_depth[next_idx] = depth
+                if next_idx == goal_idx:
+                    best_path, best_length = current_path + [next_idx], depth
+                    continue
+                current_path.append(next_idx)
+                choices.append(ordered_neighbors(next_idx))
+                next_choice.append(0)
+                if len(current_path) > peak_open:
+                    peak_open = len(current_path)
 
-        final_path = solve_recursive(start[0], start[1], [], 0)
-        
-        if final_path:
-            return final_path, _visited_call_count
-        else:
+            if _visited_call_count > MAX_VISITED_CALLS:
+                best_path = None
+                break
+            if best_path is not None or next_bound == INF:
+                break
+            bound = max(next_bound, min(bound + bound // 2, MAX_RECURSION_DEPTH))
+
+        if best_path is None:
+            note_peak_open(peak_open)
             return [], _visited_call_count
-    
+        path = yield from _coords_steps(grid, best_path, yield_every, _visited_call_count)
+        note_peak_open(peak_open)
+        return path, _visited_call_count
+
+
+def _estimator(grid, heuristic, goal_idx):
+    """Hàm h(idx) tới `goal_idx`: khoảng cách Euclid nếu không truyền heuristic riêng."""
+    if heuristic is not None:
+        return heuristic.estimator(goal_idx)
+    stride = grid.stride
+    goal_r, goal_c = divmod(goal_idx, stride)
+
+    def euclidean(idx):
+        r, c = divmod(idx, stride)
+        return sqrt((r - goal_r)**2 + (c - goal_c)**2)
+    return euclidean
+
+
+def _run_to_completion(steps):
+    """Chạy một generator `*_steps` tới cuối và trả về `(path, visited_count)` của nó."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def _trace_parents(grid, parent, end_idx):
+    path = []
+    temp = end_idx
+    while temp != -1:
+        path.append(grid.coords(temp))
+        temp = parent[temp]
+    path.reverse()
+    return path
+
+
+def _trace_parents_steps(grid, parent, end, yield_every, visited_count, cell_of=None):
+    """
+    Như `_trace_parents` nhưng nhả quyền sau mỗi `yield_every` ô (trả lại `visited_count`),
+    để việc dựng một đường rất dài không dồn hết vào lát cuối của SearchTask. `cell_of`
+    đổi nút trong `parent` sang chỉ số ô (arena của beam search); mặc định nút chính là ô.
+    """
+    path = []
+    budget = yield_every
+    node = end
+    while node != -1:
+        path.append(grid.coords(cell_of[node] if cell_of is not None else node))
+        node = parent[node]
+        budget -= 1
+        if not budget:
+            yield visited_count
+            budget = yield_every
+    path.reverse()
+    return path
+
+
+def _coords_steps(grid, indices, yield_every, visited_count):
+    """Đổi danh sách chỉ số ô sang (r, c), nhả quyền sau mỗi `yield_every` ô."""
+    path = []
+    budget = yield_every
+    for idx in indices:
+        path.append(grid.coords(idx))
+        budget -= 1
+        if not budget:
+            yield visited_count
+            budget = yield_every
+    return path
+
+
+def _join_bidirectional_path_steps(grid, forward_parent, backward_parent, meeting_node, yield_every, visited_count):
+    """Ghép nửa đường từ điểm đầu tới điểm gặp với nửa đường từ điểm gặp tới đích."""
+    path = yield from _trace_parents_steps(grid, forward_parent, meeting_node, yield_every, visited_count)
+    backward = yield from _trace_parents_steps(grid, backward_parent, backward_parent[meeting_node],
+                                               yield_every, visited_count)
+    backward.reverse()
+    return path + backward
+
+
+def _trace_parents_idx(parent, end_idx):
+    path = []
+    temp = end_idx
+    while temp != -1:
+        path.append(temp)
+        temp = parent[temp]
+    path.reverse()
+    return path
+
+
+def _jump_horizontal(cells, x, d, stride, goal_idx):
+    """Nhảy theo hàng (d = ±1) từ ô x; trả về điểm nhảy hoặc -1 nếu gặp vật cản."""
+    while True:
+        if cells[x]:
+            return -1
+        if x == goal_idx:
+            return x
+        up, down = x - stride, x + stride
+        if (cells[up] == 0 and cells[up - d]) or (cells[down] == 0 and cells[down - d]):
+            return x
+        x += d
+
+
+def _jump_vertical(cells, x, d, stride, goal_idx):
+    """Nhảy theo cột (d = ±stride); dừng ở ô có nhánh ngang dẫn tới điểm nhảy khác."""
+    while True:
+        if cells[x]:
+            return -1
+        if x == goal_idx:
+            return x
+        left, right = x - 1, x + 1
+        if (cells[left] == 0 and cells[left - d]) or (cells[right] == 0 and cells[right - d]):
+            return x
+        if (_jump_horizontal(cells, right, 1, stride, goal_idx) != -1 or
+                _jump_horizontal(cells, left, -1, stride, goal_idx) != -1):
+            return x
+        x += d
+
+
+def _expand_jump_path_steps(grid, jump_points, yield_every, visited_count):
+    """Nối các điểm nhảy (luôn thẳng hàng) thành đường đi từng ô, nhả quyền sau mỗi `yield_every` ô."""
+    path = [grid.coords(jump_points[0])]
+    stride = grid.stride
+    budget = yield_every
+    for prev, nxt in zip(jump_points, jump_points[1:]):
+        diff = nxt - prev
+        step = (1 if diff > 0 else -1) if -stride < diff < stride else (stride if diff > 0 else -stride)
+        idx = prev
+        while idx != nxt:
+            idx += step
+            path.append(grid.coords(idx))
+            budget -= 1
+            if not budget:
+                yield visited_count
+                budget = yield_every
+    return path
+
+
 ALGORITHM_MAP = {
     "A* (A-star)": PathfindingAlgorithms.a_star,
     "Dijkstra": PathfindingAlgorithms.dijkstra,
+    "Jump Point Search": PathfindingAlgorithms.jump_point_search,
     "BFS": PathfindingAlgorithms.bfs,
+    "Bidirectional BFS": PathfindingAlgorithms.bidirectional_bfs,
+    "Bidirectional A*": PathfindingAlgorithms.bidirectional_a_star,
+    "HPA*": PathfindingAlgorithms.hpa_star,
     "Greedy BFS": PathfindingAlgorithms.greedy_bfs,
     "BEAM_SEARCH": PathfindingAlgorithms.beam_search, 
     "Backtracking": PathfindingAlgorithms.backtracking_search,
 }
 
+ALGORITHM_STEP_MAP = {
+    "A* (A-star)": PathfindingAlgorithms.a_star_steps,
+    "Dijkstra": PathfindingAlgorithms.dijkstra_steps,
+    "Jump Point Search": PathfindingAlgorithms.jump_point_search_steps,
+    "BFS": PathfindingAlgorithms.bfs_steps,
+    "Bidirectional BFS": PathfindingAlgorithms.bidirectional_bfs_steps,
+    "Bidirectional A*": PathfindingAlgorithms.bidirectional_a_star_steps,
+    "Greedy BFS": PathfindingAlgorithms.greedy_bfs_steps,
+    "BEAM_SEARCH": PathfindingAlgorithms.beam_search_steps,
+    "Backtracking": PathfindingAlgorithms.backtracking_search_steps,
+}
+
 ALGORITHM_INFO = {
     "A* (A-star)": "Thuật toán tìm đường tối ưu, cân bằng giữa quãng đường và ước lượng đến đích.",
     "Dijkstra": "Tìm đường đi ngắn nhất dựa trên chi phí thực tế từ điểm bắt đầu.",
+    "Jump Point Search": "A* cải tiến, nhảy qua các hành lang thẳng thay vì mở rộng từng ô. Đường đi tối ưu, duyệt rất ít nút.",
     "BFS": "Tìm đường đi có số bước ít nhất, không xét trọng số cạnh.",
+    "Bidirectional BFS": "BFS chạy đồng thời từ hai đầu và gặp nhau ở giữa. Đường ngắn nhất, duyệt ít ô hơn BFS thường.",
+    "Bidirectional A*": "A* chạy đồng thời từ điểm đầu và điểm đích với thế cân bằng giữa hai phía. Đường tối ưu.",
+    "HPA*": "Tìm đường phân cấp: chia bản đồ thành cụm, tìm trên đồ thị các cửa giữa cụm rồi làm mịn. Rất nhanh, gần tối ưu.",
     "Greedy BFS": "Tìm đường đi dựa trên ước lượng khoảng cách đến đích, không tối ưu.",
     "BEAM_SEARCH": f"Tìm kiếm theo chùm (rộng {config.BEAM_SEARCH_WIDTH_DEFAULT}), giới hạn số nút mở rộng ở mỗi bước. Nhanh, không tối ưu, có thể không tìm thấy đường.",
-    "Backtracking": "Tìm kiếm theo chiều sâu, quay lui khi không tìm thấy đường đi. Có thể chậm hơn cho các bài toán lớn.",
-}
\ No newline at end of file
+    "Backtracking": "Tìm kiếm theo chiều sâu, quay lui khi không tìm thấy đường đi. Có giới hạn số ô duyệt: vượt giới hạn thì báo không tìm thấy đường.",
+}
+
+HEURISTIC_ALGORITHMS = ("A* (A-star)", "Bidirectional A*", "Greedy BFS", "BEAM_SEARCH")
+
+
+def algorithm_kwargs(algo_name, grid=None):
+    """
+    Tham số lấy từ config cho từng thuật toán, dùng chung cho game và benchmark.
+    Khi có `grid`, các thuật toán dùng heuristic được gắn heuristic ALT của lưới đó.
+    """
+    kwargs = {}
+    if grid is not None and config.ALT_HEURISTIC_ENABLED and algo_name in HEURISTIC_ALGORITHMS:
+        kwargs['heuristic'] = landmark_heuristic_for(grid)
+    if algo_name == "Backtracking":
+        kwargs.update(max_depth_factor=config.BACKTRACKING_MAX_DEPTH_FACTOR,
+                      max_calls_factor=config.BACKTRACKING_MAX_CALLS_FACTOR,
+                      branch_and_bound=config.BACKTRACKING_BRANCH_AND_BOUND)
+    if algo_name == "BEAM_SEARCH":
+        kwargs['beam_width'] = config.BEAM_SEARCH_WIDTH_DEFAULT
+    return kwargs
@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import CancelledError
+
+from .metrics import take_peak_open
+
+
+class SearchTask:
+    """
+    Một lượt tìm đường có thể chạy dần qua nhiều khung hình.
+
+    Bọc một generator `*_steps` của PathfindingAlgorithms: mỗi lần `step()` chỉ
+    chạy tới khi mở rộng đủ `max_nodes` nút hoặc hết `max_ms` mili-giây, rồi trả
+    quyền điều khiển cho vòng lặp game. Có các hàm done()/result()/cancel() giống
+    concurrent.futures.Future để PathFinder xử lý chung mọi lượt tính giá.
+    `elapsed_ms` cộng dồn thời gian thực sự chạy qua các bước, `peak_open` là kích thước
+    lớn nhất của tập mở do thuật toán báo lại (None nếu thuật toán không báo).
+    `speculative` đánh dấu lượt tính giá trước chạy nền (ghi sổ đo riêng).
+
+    Task cũng chạy được trên pool luồng bằng `submit_to`; khi đó `cancel()` từ luồng chính
+    chỉ đặt cờ và luồng phụ dừng ở lần nhả quyền kế tiếp của generator.
+    """
+
+    def __init__(self, steps, speculative=False):
+        self._steps = steps
+        self.speculative = speculative
+        self.threaded = False
+        self._lock = threading.Lock()
+        self._result = None
+        self._exception = None
+        self._done = False
+        self._cancelled = False
+        self.visited_count = 0
+        self.elapsed_ms = 0.0
+        self.peak_open = None
+
+    @classmethod
+    def from_callable(cls, func, *args, speculative=False, **kwargs):
+        """
+        Bọc một hàm tìm đường thường (không chia nhỏ được) thành task một bước; chỉ nên
+        chạy trên pool luồng vì bước duy nhất đó không dừng được giữa chừng.
+        """
+        def steps():
+            return func(*args, **kwargs)
+            yield
+        return cls(steps(), speculative)
+
+    def submit_to(self, executor):
+        """Chạy task tới khi xong trên một luồng của `executor`."""
+        self.threaded = True
+        executor.submit(self._run_until_done)
+        return self
+
+    def _run_until_done(self):
+        while not self.step():
+            pass
+
+    def step(self, max_nodes=None, max_ms=None):
+        """Chạy tiếp lượt tìm kiếm trong giới hạn cho phép; trả về True nếu đã xong."""
+        if self._done:
+            return True
+        with self._lock:
+            if self._cancelled:
+                return True
+            started = time.perf_counter()
+            deadline = started + max_ms / 1000.0 if max_ms is not None else None
+            start_count = self.visited_count
+            take_peak_open()
+            try:
+                while True:
+                    if self._cancelled:
+                        self._steps.close()
+                        break
+                    self.visited_count = next(self._steps)
+                    if max_nodes is not None and self.visited_count - start_count >= max_nodes:
+                        break
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        break
+            except StopIteration as stop:
+                self._result = stop.value
+                self.peak_open = take_peak_open()
+                self._done = True
+            except Exception as e:
+                self._exception = e
+                self._done = True
+            self.elapsed_ms += (time.perf_counter() - started) * 1000
+        return self._done
+
+    def run(self):
+        """Chạy đến khi xong và trả về kết quả."""
+        self._run_until_done()
+        return self.result()
+
+    def done(self):
+        return self._done
+
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        if self._done:
+            return False
+        self._cancelled = True
+        self._done = True
+        # Đang chạy trên luồng khác thì luồng đó tự đóng generator khi thấy cờ.
+        if self._lock.acquire(blocking=False):
+            try:
+                self._steps.close()
+            finally:
+                self._lock.release()
+        return True
+
+    def result(self):
+        if self._cancelled:
+            raise CancelledError()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
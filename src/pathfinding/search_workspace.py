@@ -0,0 +1,33 @@
+from array import array
+
+MAX_GENERATION = 0xFFFFFFFF
+
+
+class SearchWorkspace:
+    """
+    Bộ đệm trạng thái của một lượt tìm kiếm, được tái sử dụng giữa các truy vấn.
+
+    Mỗi ô có một "tem" thế hệ: giá trị `cost`/`parent` của ô chỉ hợp lệ khi
+    `stamp[idx] == generation`. Bắt đầu truy vấn mới chỉ cần tăng `generation`,
+    nên chi phí truy vấn tỉ lệ với số ô thực sự chạm tới chứ không phải diện tích bản đồ.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.cost = array('i', [0]) * size
+        self.parent = array('i', [-1]) * size
+        self.stamp = array('I', [0]) * size
+        self.generation = 0
+
+    @property
+    def nbytes(self):
+        """Số byte của các mảng trạng thái."""
+        return sum(len(values) * values.itemsize for values in (self.cost, self.parent, self.stamp))
+
+    def begin(self):
+        """Bắt đầu một truy vấn mới và trả về thế hệ hiện tại."""
+        self.generation += 1
+        if self.generation > MAX_GENERATION:
+            self.stamp = array('I', [0]) * self.size
+            self.generation = 1
+        return self.generation
@@ -0,0 +1,43 @@
+import numpy as np
+
+from .grid_map import as_grid_map
+
+
+def wavefront_distances(grid, source, padded=False):
+    """
+    BFS toàn bản đồ bằng NumPy: mỗi vòng lặp mở rộng cả biên sóng một lúc.
+
+    Biên được giữ dưới dạng mảng chỉ số ô (theo chỉ số có viền của GridMap); láng
+    giềng của cả biên là một phép cộng với `neighbor_offsets`, lọc bằng mặt nạ "đi
+    được và chưa có khoảng cách", và bỏ trùng bằng mảng đánh dấu thay vì sắp xếp.
+    Trả về mảng int32 (rows, cols) số bước từ `source`, -1 nếu không tới được; với
+    `padded=True` trả về mảng một chiều theo chỉ số có viền.
+    """
+    grid = as_grid_map(grid)
+    cells = np.frombuffer(grid.cells, dtype=np.uint8)
+    # -2 đánh dấu vật cản để một phép so sánh `== -1` vừa lọc vật cản vừa lọc ô đã tới.
+    distance = np.where(cells == grid.FREE, -1, -2).astype(np.int32)
+
+    source_idx = grid.index(*source)
+    if grid.in_bounds(*source) and distance[source_idx] == -1:
+        offsets = np.array(grid.neighbor_offsets, dtype=np.intp)
+        first_seen = np.zeros(grid.size, dtype=np.intp)
+        distance[source_idx] = 0
+        frontier = np.array([source_idx], dtype=np.intp)
+        step = 0
+        while frontier.size:
+            step += 1
+            neighbors = (frontier[:, None] + offsets).ravel()
+            neighbors = neighbors[distance[neighbors] == -1]
+            if not neighbors.size:
+                break
+            order = np.arange(neighbors.size)
+            first_seen[neighbors] = order
+            neighbors = neighbors[first_seen[neighbors] == order]
+            distance[neighbors] = step
+            frontier = neighbors
+
+    distance[distance == -2] = -1
+    if padded:
+        return distance
+    return distance.reshape(grid.rows + 2, grid.stride)[1:-1, 1:-1].copy()
@@ -0,0 +1,346 @@
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+import src.config as config
+from src.utils.file_handle import load_csv
+
+BUNDLE_MAGIC = b'PMAP'
+BUNDLE_VERSION = 2
+
+# Cờ lật của Tiled nằm ở 3 bit cao của GID; lưu lại dưới dạng 3 bit thấp của một byte.
+FLIP_HORIZONTAL = 4
+FLIP_VERTICAL = 2
+FLIP_DIAGONAL = 1
+_GID_MASK = 0x1FFFFFFF
+
+SECTIONS = ('passability', 'floor_tiles', 'floor_flags', 'entity_tiles', 'entity_flags', 'entities',
+            'collision_rects')
+
+_HEADER = struct.Struct('<4sHHii')  # magic, phiên bản, số section, rows, cols
+_SOURCE = struct.Struct('<qqI')  # mtime_ns, kích thước, crc32 của một file CSV nguồn
+_SECTION = struct.Struct('<II')  # vị trí, độ dài
+_ENTITY = struct.Struct('<iii')  # mã thực thể, hàng, cột
+_RECT = struct.Struct('<iiii')  # cột, hàng, rộng, cao (đơn vị ô)
+_SRCALPHA_BYTES_PER_PIXEL = 4
+
+
+def decode_tile(value):
+    """
+    Giải mã một ô CSV của Tiled thành `(tile_id, cờ_lật)`; ô rỗng ('-1' hoặc '') là (-1, 0).
+    Giá trị âm khác -1 là GID có bật cờ lật (ví dụ -1610612627 = ô 109, lật ngang + chéo).
+    """
+    value = value.strip()
+    if value == '' or value == '-1':
+        return -1, 0
+    try:
+        raw = int(value) & 0xFFFFFFFF
+    except ValueError:
+        return -1, 0
+    return raw & _GID_MASK, raw >> 29
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    with open(path, 'rb') as file:
+        checksum = zlib.crc32(file.read())
+    return stat.st_mtime_ns, stat.st_size, checksum
+
+
+def _decode_layer(csv_rows, rows, cols):
+    tiles = array('i', [-1]) * (rows * cols)
+    flags = bytearray(rows * cols)
+    for r, row_data in enumerate(csv_rows[:rows]):
+        base = r * cols
+        for c, value in enumerate(row_data[:cols]):
+            tiles[base + c], flags[base + c] = decode_tile(value)
+    return tiles, flags
+
+
+def merge_blocked_rects(cells, rows, cols, stride=None, origin=0):
+    """
+    Gộp các ô vật cản thành hình chữ nhật theo kiểu tham lam: quét hàng, gặp ô vật cản chưa
+    được phủ thì kéo dài hết đoạn trên hàng đó, rồi kéo xuống dưới chừng nào cả đoạn ở hàng
+    kế tiếp vẫn là vật cản chưa được phủ. Các hình không chồng nhau và phủ đúng mọi ô vật cản.
+
+    Ô (r, c) nằm ở `cells[origin + r*stride + c]` (khác 0 = vật cản), nên dùng được cho cả
+    mảng không viền (`stride=cols`) lẫn `GridMap.cells` (`stride=grid.stride, origin=stride+1`).
+    Trả về danh sách (cột, hàng, rộng, cao) theo đơn vị ô.
+    """
+    stride = cols if stride is None else stride
+    covered = bytearray(rows * cols)
+    rects = []
+    for r in range(rows):
+        base, covered_base = origin + r * stride, r * cols
+        c = 0
+        while c < cols:
+            if not cells[base + c] or covered[covered_base + c]:
+                c += 1
+                continue
+            start = c
+            while c < cols and cells[base + c] and not covered[covered_base + c]:
+                c += 1
+            width = c - start
+            height = 1
+            while r + height < rows:
+                below = origin + (r + height) * stride + start
+                covered_below = (r + height) * cols + start
+                if (0 in cells[below:below + width]
+                        or covered.find(1, covered_below, covered_below + width) != -1):
+                    break
+                covered[covered_below:covered_below + width] = b'\x01' * width
+                height += 1
+            rects.append((start, r, width, height))
+    return rects
+
+
+def collision_report(bundle, tile_size=config.TILE_SIZE):
+    """
+    So sánh cách cũ (mỗi ô vật cản là một sprite `Tile` có Surface SRCALPHA riêng) với các
+    hình chữ nhật đã gộp của bundle: số đối tượng và bộ nhớ ước tính (byte).
+    """
+    import pygame
+
+    rect = pygame.Rect(0, 0, tile_size, tile_size)
+    surface = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+    sprite = pygame.sprite.Sprite()
+    sprite.image, sprite.rect = surface, rect
+    sprite_bytes = (sys.getsizeof(sprite) + sys.getsizeof(sprite.__dict__) + sys.getsizeof(surface)
+                    + sys.getsizeof(rect) + tile_size * tile_size * _SRCALPHA_BYTES_PER_PIXEL)
+    blocked = sum(width * height for _, _, width, height in bundle.collision_rects)
+    rect_count = len(bundle.collision_rects)
+    return {
+        'blocked_cells': blocked,
+        'merged_rects': rect_count,
+        'sprite_bytes': blocked * sprite_bytes + sys.getsizeof([None] * blocked),
+        'rect_bytes': rect_count * sys.getsizeof(rect) + sys.getsizeof([None] * rect_count),
+    }
+
+
+def compile_map_bundle(floor_csv_path, entity_csv_path):
+    """Đọc hai file CSV của bản đồ và trả về nội dung bundle nhị phân (bytes)."""
+    floor_rows = load_csv(floor_csv_path)
+    entity_rows = load_csv(entity_csv_path)
+    rows = len(floor_rows)
+    cols = max((len(row) for row in floor_rows), default=0)
+
+    floor_tiles, floor_flags = _decode_layer(floor_rows, rows, cols)
+    # Cùng quy ước với GridMap.from_floor_data: ô khác '-1'/rỗng, hoặc ô thiếu ở cuối hàng ngắn, là vật cản.
+    blocked = bytearray([1]) * (rows * cols)
+    for r, row_data in enumerate(floor_rows):
+        for c, value in enumerate(row_data):
+            if value.strip() in ('', '-1'):
+                blocked[r * cols + c] = 0
+    passability = bytearray((rows * cols + 7) // 8)
+    for i, value in enumerate(blocked):
+        if value:
+            passability[i >> 3] |= 1 << (i & 7)
+
+    entity_tiles, entity_flags = _decode_layer(entity_rows, rows, cols)
+    entities = bytearray()
+    for r, row_data in enumerate(entity_rows):
+        for c, value in enumerate(row_data):
+            value = value.strip()
+            if value and value != '-1':
+                try:
+                    entities += _ENTITY.pack(int(value), r, c)
+                except ValueError:
+                    continue
+
+    collision = bytearray()
+    for rect in merge_blocked_rects(blocked, rows, cols):
+        collision += _RECT.pack(*rect)
+
+    payloads = {
+        'passability': bytes(passability),
+        'floor_tiles': floor_tiles.tobytes(),
+        'floor_flags': bytes(floor_flags),
+        'entity_tiles': entity_tiles.tobytes(),
+        'entity_flags': bytes(entity_flags),
+        'entities': bytes(entities),
+        'collision_rects': bytes(collision),
+    }
+    header = _HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(SECTIONS), rows, cols)
+    header += _SOURCE.pack(*_source_stamp(floor_csv_path)) + _SOURCE.pack(*_source_stamp(entity_csv_path))
+    offset = len(header) + _SECTION.size * len(SECTIONS)
+    table, body = bytearray(), bytearray()
+    for name in SECTIONS:
+        # Căn 4 byte để các mảng int32 có thể đọc thẳng từ mmap bằng memoryview.cast('i').
+        padding = -(offset + len(body)) % 4
+        body += bytes(padding)
+        table += _SECTION.pack(offset + len(body), len(payloads[name]))
+        body += payloads[name]
+    return bytes(header) + bytes(table) + bytes(body)
+
+
+def write_map_bundle(bundle_path, floor_csv_path, entity_csv_path):
+    """Biên dịch và ghi bundle (ghi file tạm rồi đổi tên để không để lại file hỏng)."""
+    data = compile_map_bundle(floor_csv_path, entity_csv_path)
+    os.makedirs(os.path.dirname(bundle_path) or '.', exist_ok=True)
+    temp_path = bundle_path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(data)
+    os.replace(temp_path, bundle_path)
+    return data
+
+
+class MapBundle:
+    """
+    Bản đồ đã biên dịch, đọc trực tiếp từ bộ nhớ ánh xạ (mmap) của file bundle.
+
+    - `passability`: bitset rows*cols, bit `r*cols + c` = 1 nếu ô là vật cản.
+    - `floor_tiles`/`entity_tiles`: mã ô Tiled (int32, -1 = rỗng); `*_flags` là cờ lật
+      FLIP_HORIZONTAL/FLIP_VERTICAL/FLIP_DIAGONAL của từng ô.
+    - `entities`: mã thực thể -> danh sách (r, c) theo thứ tự quét hàng của CSV.
+    - `collision_rects`: các ô vật cản đã gộp thành hình chữ nhật (cột, hàng, rộng, cao) theo
+      đơn vị ô, xem `merge_blocked_rects`.
+    """
+
+    def __init__(self, buffer, path=None):
+        self.path = path
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, version, section_count, self.rows, self.cols = _HEADER.unpack_from(view, 0)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION or section_count != len(SECTIONS):
+            raise ValueError(f"File bundle bản đồ không hợp lệ hoặc khác phiên bản: {path}")
+        if self.rows < 0 or self.cols < 0:
+            raise ValueError(f"File bundle bản đồ có kích thước sai: {path}")
+        offset = _HEADER.size
+        self.floor_source = _SOURCE.unpack_from(view, offset)
+        self.entity_source = _SOURCE.unpack_from(view, offset + _SOURCE.size)
+        offset += 2 * _SOURCE.size
+        sections = {}
+        for name in SECTIONS:
+            start, length = _SECTION.unpack_from(view, offset)
+            if start + length > len(view):
+                raise ValueError(f"File bundle bản đồ bị cắt cụt: {path}")
+            sections[name] = view[start:start + length]
+            offset += _SECTION.size
+        cells = self.rows * self.cols
+        expected = {'passability': (cells + 7) // 8, 'floor_tiles': 4 * cells, 'floor_flags': cells,
+                    'entity_tiles': 4 * cells, 'entity_flags': cells}
+        for name, length in expected.items():
+            if len(sections[name]) != length:
+                raise ValueError(f"File bundle bản đồ có section '{name}' sai độ dài: {path}")
+
+        self.passability = sections['passability']
+        self.floor_tiles = sections['floor_tiles'].cast('i')
+        self.floor_flags = sections['floor_flags']
+        self.entity_tiles = sections['entity_tiles'].cast('i')
+        self.entity_flags = sections['entity_flags']
+        self.entities = {}
+        for entity_id, r, c in _ENTITY.iter_unpack(sections['entities']):
+            self.entities.setdefault(entity_id, []).append((r, c))
+        self.collision_rects = list(_RECT.iter_unpack(sections['collision_rects']))
+
+    @classmethod
+    def from_file(cls, bundle_path):
+        with open(bundle_path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, bundle_path)
+
+    def is_blocked(self, row, col):
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return True
+        i = row * self.cols + col
+        return bool(self.passability[i >> 3] & (1 << (i & 7)))
+
+    def blocked_cells(self):
+        """Các ô (r, c) là vật cản, theo thứ tự quét hàng."""
+        for i in range(self.rows * self.cols):
+            if self.passability[i >> 3] & (1 << (i & 7)):
+                yield divmod(i, self.cols)
+
+    def floor_tile(self, row, col):
+        i = row * self.cols + col
+        return self.floor_tiles[i], self.floor_flags[i]
+
+    def entity_positions(self, entity_id):
+        """Các ô (r, c) có thực thể `entity_id` (chuỗi như trong config hoặc số)."""
+        try:
+            return list(self.entities.get(int(entity_id), ()))
+        except ValueError:
+            return []
+
+
+def _bundle_is_fresh(bundle_path, floor_csv_path, entity_csv_path):
+    """
+    Bundle còn dùng được khi mtime và kích thước của cả hai CSV khớp với lúc biên dịch; nếu
+    chỉ mtime đổi (file được chạm/sao chép lại) thì so thêm crc32 của nội dung, và khi crc32
+    vẫn khớp thì ghi lại mtime mới vào header để lần khởi động sau không phải băm lại CSV.
+    """
+    try:
+        with open(bundle_path, 'rb') as file:
+            head = file.read(_HEADER.size + 2 * _SOURCE.size)
+    except OSError:
+        return False
+    if len(head) < _HEADER.size + 2 * _SOURCE.size:
+        return False
+    magic, version, section_count, _, _ = _HEADER.unpack_from(head, 0)
+    if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION or section_count != len(SECTIONS):
+        return False
+    restamps = []
+    for i, path in enumerate((floor_csv_path, entity_csv_path)):
+        offset = _HEADER.size + i * _SOURCE.size
+        mtime_ns, size, checksum = _SOURCE.unpack_from(head, offset)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Không còn CSV nguồn để so: tin vào bundle đã có.
+            continue
+        if stat.st_size != size:
+            return False
+        if stat.st_mtime_ns != mtime_ns:
+            with open(path, 'rb') as file:
+                if zlib.crc32(file.read()) != checksum:
+                    return False
+            restamps.append((offset, _SOURCE.pack(stat.st_mtime_ns, size, checksum)))
+    if restamps:
+        try:
+            with open(bundle_path, 'r+b') as file:
+                for offset, stamp in restamps:
+                    file.seek(offset)
+                    file.write(stamp)
+        except OSError:
+            pass
+    return True
+
+
+def load_map_bundle(floor_csv_path=config.FLOOR_BLOCK_CSV_PATH, entity_csv_path=config.ENTITY_CSV_PATH,
+                    bundle_path=config.MAP_BUNDLE_PATH):
+    """Nạp bundle bằng mmap, biên dịch lại từ CSV nếu bundle chưa có, đã cũ hoặc bị hỏng."""
+    if _bundle_is_fresh(bundle_path, floor_csv_path, entity_csv_path):
+        try:
+            return MapBundle.from_file(bundle_path)
+        except (ValueError, TypeError, struct.error) as e:
+            print(f"Cảnh báo: Bundle bản đồ bị hỏng, biên dịch lại từ CSV: {e}")
+    try:
+        write_map_bundle(bundle_path, floor_csv_path, entity_csv_path)
+    except OSError as e:
+        print(f"Cảnh báo: Không ghi được bundle bản đồ, dùng bản biên dịch trong bộ nhớ: {e}")
+        return MapBundle(compile_map_bundle(floor_csv_path, entity_csv_path))
+    return MapBundle.from_file(bundle_path)
+
+
+def main():
+    """Biên dịch bundle từ các đường dẫn trong config: `python -m src.utils.map_bundle`."""
+    started = time.perf_counter()
+    data = write_map_bundle(config.MAP_BUNDLE_PATH, config.FLOOR_BLOCK_CSV_PATH, config.ENTITY_CSV_PATH)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    bundle = MapBundle(data)
+    print(f"Đã ghi {config.MAP_BUNDLE_PATH}: {len(data)} byte, {bundle.rows}x{bundle.cols} ô, "
+          f"{sum(len(cells) for cells in bundle.entities.values())} thực thể, "
+          f"{len(bundle.collision_rects)} hình chữ nhật vật cản ({elapsed_ms:.1f} ms)")
+    report = collision_report(bundle)
+    print(f"Va chạm: {report['blocked_cells']} sprite Tile -> {report['merged_rects']} hình chữ nhật "
+          f"({report['blocked_cells'] / max(report['merged_rects'], 1):.1f}x ít hơn), "
+          f"bộ nhớ ~{report['sprite_bytes'] / 1024:.0f} KiB -> ~{report['rect_bytes'] / 1024:.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())